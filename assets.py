@@ -0,0 +1,78 @@
+"""
+Fingerprinted static assets for MovieZone.
+
+At startup every file under static/ is read once, hashed, and exposed under
+/assets/<name>.<hash>.<ext>. Because the URL changes whenever the content
+changes, responses can be cached by browsers and proxies forever. Compressible
+files are gzipped (and brotli-compressed when available) once at build time.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE_TYPES = {"text/css", "application/javascript", "text/javascript", "image/svg+xml"}
+
+
+class AssetManifest:
+    def __init__(self, static_dir, url_prefix="/assets"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.manifest = {}
+        self._files = {}
+
+    def build(self):
+        """Hashes every file under static_dir and returns the {logical name: hashed name} manifest."""
+        manifest, files = {}, {}
+        for root, _, names in os.walk(self.static_dir):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                logical = os.path.relpath(path, self.static_dir).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    data = f.read()
+                stem, ext = os.path.splitext(logical)
+                hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+                mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                encoded = {}
+                if mimetype in COMPRESSIBLE_TYPES:
+                    encoded["gzip"] = gzip.compress(data, compresslevel=9)
+                    if brotli:
+                        encoded["br"] = brotli.compress(data, quality=11)
+                manifest[logical] = hashed
+                files[hashed] = (data, mimetype, encoded)
+        self.manifest, self._files = manifest, files
+        return manifest
+
+    def url(self, logical):
+        return f"{self.url_prefix}/{self.manifest[logical]}"
+
+    def size(self, logical):
+        return len(self._files[self.manifest[logical]][0])
+
+    def lookup(self, hashed, accept_encodings):
+        """Returns (body, mimetype, content encoding or None), or None for an unknown name."""
+        entry = self._files.get(hashed)
+        if entry is None:
+            return None
+        data, mimetype, encoded = entry
+        for encoding in ("br", "gzip"):
+            if encoding in encoded and accept_encodings[encoding]:
+                return encoded[encoding], mimetype, encoding
+        return data, mimetype, None
+
+    def report(self, templates):
+        """Prints, per template, the bytes that used to be inline versus the HTML left after extraction."""
+        for name, source in templates.items():
+            linked = sorted(set(re.findall(r"asset_url\('([^']+)'\)", source)))
+            if not linked:
+                continue
+            asset_bytes = sum(self.size(logical) for logical in linked)
+            print(f"Page {name:13} before {len(source) + asset_bytes:>7} bytes inline, "
+                  f"after {len(source):>7} bytes + {asset_bytes:>6} bytes of cached assets ({', '.join(linked)})")
@@ -0,0 +1,9 @@
+"""
+Benchmark suite for MovieZone.
+
+  bench/seed.py       synthetic catalogs (1k / 10k / 100k titles) in a local MongoDB
+  bench/fake_tmdb.py  local stand-in for the TMDB API with configurable latency
+  bench/run.py        drives the public and admin routes and saves latency/RSS per route as JSON
+
+See bench/run.py for the usual workflows.
+"""
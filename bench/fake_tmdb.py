@@ -0,0 +1,130 @@
+"""
+Local stand-in for the TMDB API.
+
+It answers the endpoints the app uses: /search/{movie,tv}, /{movie,tv}/<id>
+and /{movie,tv}/<id>/videos, with or without the /3 prefix. Replies come
+after a configurable latency, and a share of them can fail with 500. The
+answers are derived from the request, so they are the same on every run.
+Point the app at it with TMDB_BASE_URL:
+
+  python -m bench.fake_tmdb --port 8099 --latency-ms 120 --jitter-ms 40
+  TMDB_BASE_URL=http://127.0.0.1:8099/3 TMDB_API_KEY=bench python serve.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+GENRES = ["Action", "Adventure", "Comedy", "Crime", "Drama", "Fantasy", "Horror", "Mystery", "Romance", "Thriller"]
+DETAILS_RE = re.compile(r"^/(movie|tv)/(\d+)(/videos)?$")
+SEARCH_RE = re.compile(r"^/search/(movie|tv)$")
+
+
+def _number(text, modulo):
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16) % modulo
+
+
+def details(kind, tmdb_id):
+    seed = f"{kind}:{tmdb_id}"
+    data = {
+        "id": tmdb_id,
+        "poster_path": f"/{hashlib.md5(seed.encode()).hexdigest()[:27]}.jpg",
+        "overview": f"Synthetic overview for {kind} {tmdb_id}.",
+        "genres": [{"id": i, "name": GENRES[(_number(seed, 97) + i) % len(GENRES)]} for i in range(1 + _number(seed, 3))],
+        "vote_average": round(4 + _number(seed, 50) / 10, 1),
+    }
+    date = f"{1980 + _number(seed, 46)}-{1 + _number(seed, 12):02d}-{1 + _number(seed, 28):02d}"
+    data["release_date" if kind == "movie" else "first_air_date"] = date
+    return data
+
+
+def videos(kind, tmdb_id):
+    # About one title in six has no trailer, like the real catalog.
+    if _number(f"videos:{kind}:{tmdb_id}", 6) == 0:
+        return {"id": tmdb_id, "results": []}
+    key = hashlib.md5(f"trailer:{kind}:{tmdb_id}".encode()).hexdigest()[:11]
+    return {"id": tmdb_id, "results": [{"type": "Trailer", "site": "YouTube", "key": key}]}
+
+
+class FakeTMDB(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=100, jitter_ms=0, error_rate=0.0):
+        super().__init__(address, Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.counters = {"requests": 0, "errors": 0}
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/3"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.counters["requests"] += 1
+        delay = max(0.0, server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)) / 1000
+        time.sleep(delay)
+        if random.random() < server.error_rate:
+            server.counters["errors"] += 1
+            return self._reply(500, {"status_message": "Injected failure."})
+        parts = urlsplit(self.path)
+        path = parts.path[2:] if parts.path.startswith("/3/") else parts.path
+        match = SEARCH_RE.match(path)
+        if match:
+            query = parse_qs(parts.query).get("query", [""])[0]
+            if not query:
+                return self._reply(200, {"results": []})
+            return self._reply(200, {"results": [{"id": 1000 + _number(query.lower(), 900000)}]})
+        match = DETAILS_RE.match(path)
+        if match:
+            kind, tmdb_id, is_videos = match.group(1), int(match.group(2)), match.group(3)
+            return self._reply(200, videos(kind, tmdb_id) if is_videos else details(kind, tmdb_id))
+        self._reply(404, {"status_message": "The resource you requested could not be found."})
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(host="127.0.0.1", port=0, latency_ms=100, jitter_ms=0, error_rate=0.0):
+    """Starts the server on a background thread and returns it; port 0 picks a free port."""
+    server = FakeTMDB((host, port), latency_ms, jitter_ms, error_rate)
+    threading.Thread(target=server.serve_forever, name="fake-tmdb", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the TMDB API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = FakeTMDB((args.host, args.port), args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Fake TMDB listening on {server.url} ({args.latency_ms} ms +/- {args.jitter_ms} ms).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
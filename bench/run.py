@@ -0,0 +1,442 @@
+"""
+Load benchmark for MovieZone.
+
+Against a running server, with MongoDB seeded by bench.seed:
+
+  python -m bench.seed 10k --db moviezone_bench
+  python -m bench.fake_tmdb --latency-ms 120 &
+  MONGO_DB_NAME=moviezone_bench TMDB_API_KEY=bench TMDB_BASE_URL=http://127.0.0.1:8099/3 python serve.py &
+  python -m bench.run --target http://127.0.0.1:5000 --pid <serve.py master pid> --size 10k
+
+Everything in this process, with mongomock standing in for MongoDB
+(pip install mongomock). This is quick for before/after comparisons, but the
+absolute numbers are mongomock's, not MongoDB's:
+
+  python -m bench.run --in-process --size 1k --concurrency 8
+
+Each route first gets --warmup untimed requests. It then gets --requests
+timed requests from --concurrency threads. The seeded catalog is fully
+enriched, so the read routes never reach TMDB; the write routes do and run
+last. admin_add saves a bare title, which queues its TMDB enrichment in the
+background. import uploads --import-rows bare titles and is timed until the
+import reports done, TMDB lookups included. Write routes get --write-requests
+requests, and imports go one at a time, as an admin would send them. The p50/p95/p99/max latency,
+throughput, errors and RSS of each route are written to
+bench/results/<name>.json. RSS covers the server process and its children:
+the --pid tree, or this process with --in-process. Compare two runs with:
+
+  python -m bench.run compare bench/results/before.json bench/results/after.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+from bench import fake_tmdb
+from bench.seed import BENCH_DB, TITLE_NOUNS, TITLE_WORDS, parse_size, seed_collection
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+EPISODE_PAGE_SIZE = int(os.getenv("EPISODE_PAGE_SIZE", 50))
+LIST_PAGES = ["/trending_movies", "/movies_only", "/webseries", "/coming_soon", "/recently_added"]
+WORDS = [word.lower() for word in TITLE_WORDS + TITLE_NOUNS]
+
+
+# --- Routes: each returns the path of one request ---
+
+def _series(rng, samples, min_episodes=1):
+    pool = [s for s in samples["series"] if s[1] >= min_episodes] or samples["series"]
+    return rng.choice(pool)
+
+
+def _episode_page(rng, samples):
+    # Long series, where the ?eps= range links matter.
+    series_id, count = _series(rng, samples, min_episodes=100)
+    return f"/movie/{series_id}?eps={rng.randint(1, math.ceil(count / EPISODE_PAGE_SIZE))}"
+
+
+def _watch_episode(rng, samples):
+    series_id, count = _series(rng, samples)
+    return f"/watch/{series_id}?ep={rng.randint(1, count)}"
+
+
+def _new_title(rng, samples):
+    # The run id keeps titles fresh across runs, so none are skipped as duplicates of an earlier run.
+    return f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_NOUNS)} {samples['run']}-{rng.getrandbits(32):08x}"
+
+
+def _admin_add(rng, samples):
+    # No poster or overview, so the save queues a TMDB enrichment.
+    return {"method": "POST", "url": "/admin", "data": {"title": _new_title(rng, samples), "content_type": "movie"}}
+
+
+def _import(rng, samples):
+    rows = "".join(f"{_new_title(rng, samples)},{rng.choice(('movie', 'series'))}\n" for _ in range(samples["import_rows"]))
+    return {"method": "POST", "url": "/admin/import", "files": {"file": ("bench.csv", "title,type\n" + rows, "text/csv")}}
+
+
+ROUTES = {
+    "home": lambda rng, s: "/",
+    "search": lambda rng, s: "/?q=" + quote(" ".join(rng.sample(WORDS, rng.choice((1, 1, 2))))),
+    "suggest": lambda rng, s: "/api/suggest?q=" + rng.choice(WORDS)[:rng.randint(2, 4)],
+    "genres": lambda rng, s: "/genres",
+    "genre": lambda rng, s: "/genre/" + quote(rng.choice(s["genres"])),
+    "badge": lambda rng, s: "/badge/" + quote(rng.choice(s["badges"])),
+    "list": lambda rng, s: rng.choice(LIST_PAGES),
+    "detail": lambda rng, s: "/movie/" + rng.choice(s["ids"]),
+    "detail_episodes": _episode_page,
+    "watch": lambda rng, s: "/watch/" + rng.choice(s["movies"]),
+    "watch_episode": _watch_episode,
+    "admin": lambda rng, s: "/admin",
+    "admin_api": lambda rng, s: f"/admin/api/content?page={rng.randint(1, 20)}" + (f"&q={rng.choice(WORDS)}" if rng.random() < 0.3 else ""),
+    # Writes change the catalog version, so they come after the reads.
+    "admin_add": _admin_add,
+    "import": _import,
+}
+ADMIN_ROUTES = {"admin", "admin_api", "admin_add", "import"}
+WRITE_ROUTES = {"admin_add", "import"}
+SERIAL_ROUTES = {"import"}  # each process runs one import at a time
+IMPORT_POLL_SECONDS = 0.05
+
+
+def load_samples(collection):
+    """Ids, genres and badges to build request paths from."""
+    samples = {"ids": [], "movies": [], "series": []}
+    for doc in collection.find({}, {"type": 1, "episode_count": 1}):
+        doc_id = str(doc["_id"])
+        samples["ids"].append(doc_id)
+        if doc.get("type") == "series":
+            samples["series"].append((doc_id, doc.get("episode_count") or 1))
+        else:
+            samples["movies"].append(doc_id)
+    if not samples["ids"]:
+        sys.exit("The catalog is empty; seed it with `python -m bench.seed <size> --db <database>` first.")
+    samples["genres"] = [g for g in collection.distinct("genres") if g] or ["Action"]
+    samples["badges"] = [b for b in collection.distinct("poster_badge") if b] or ["HD"]
+    return samples
+
+
+# --- Measurement ---
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+def tree_rss(root_pid):
+    """Resident memory in bytes of `root_pid` and all its descendants, or None without /proc."""
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) * 1024
+        except (OSError, StopIteration):
+            pass
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class RssSampler:
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = self.last = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while True:
+            rss = tree_rss(self.pid)
+            if rss is not None:
+                self.last, self.peak = rss, max(rss, self.peak or 0)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _mb(value):
+    return round(value / 1024 / 1024, 1) if value is not None else None
+
+
+def _wait_for_import(session, url, auth, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        progress = session.get(url, auth=auth, timeout=timeout).json()
+        if progress.get("done"):
+            return not progress.get("error")
+        time.sleep(IMPORT_POLL_SECONDS)
+    return False
+
+
+def run_route(base_url, name, samples, args, pid):
+    rng = random.Random(f"{args.seed}:{name}")
+    count, warmup = (args.write_requests, min(args.warmup, 2)) if name in WRITE_ROUTES else (args.requests, args.warmup)
+    paths = [ROUTES[name](rng, samples) for _ in range(warmup + count)]
+    auth = (os.getenv("ADMIN_USERNAME", "admin"), os.getenv("ADMIN_PASSWORD", "password")) if name in ADMIN_ROUTES else None
+    local = threading.local()
+
+    def fetch(path):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        call = path if isinstance(path, dict) else {"method": "GET", "url": path}
+        started = time.perf_counter()
+        try:
+            res = session.request(**dict(call, url=base_url + call["url"]), auth=auth, timeout=args.timeout, allow_redirects=False)
+            ok = res.status_code < 400
+            if ok and name == "import":
+                ok = _wait_for_import(session, base_url + res.json()["status_url"], auth, args.timeout)
+        except (requests.RequestException, ValueError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    concurrency = 1 if name in SERIAL_ROUTES else args.concurrency
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        list(pool.map(fetch, paths[:warmup]))
+        with RssSampler(pid) as rss:
+            started = time.perf_counter()
+            results = list(pool.map(fetch, paths[warmup:]))
+            wall = time.perf_counter() - started
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "throughput_rps": round(len(results) / wall, 1),
+        "rss_mb_peak": _mb(rss.peak),
+        "rss_mb_end": _mb(rss.last),
+    }
+
+
+# --- Server setup ---
+
+def _patch_mongomock(mongomock):
+    """Makes mongomock answer projections like MongoDB does, from many threads at once, and take pymongo's bulk updates."""
+    find, find_one = mongomock.collection.Collection.find, mongomock.collection.Collection.find_one
+
+    def patched_find(self, filter=None, projection=None, *args, **kwargs):
+        # mongomock edits the projection dict in place, which races when threads share one (e.g. CARD_FIELDS).
+        return find(self, filter, dict(projection) if isinstance(projection, dict) else projection, *args, **kwargs)
+
+    def patched_find_one(self, filter=None, projection=None, *args, **kwargs):
+        # A projection holding only {"field": {"$slice": [skip, limit]}} keeps every other field in
+        # MongoDB (movie_detail relies on it); mongomock treats it as an inclusion projection.
+        if isinstance(projection, dict) and len(projection) == 1:
+            (field, spec), = projection.items()
+            if isinstance(spec, dict) and set(spec) == {"$slice"} and isinstance(spec["$slice"], list):
+                doc = find_one(self, filter, *args, **kwargs)
+                if doc and isinstance(doc.get(field), list):
+                    skip, limit = spec["$slice"]
+                    doc[field] = doc[field][skip:skip + limit]
+                return doc
+        return find_one(self, filter, projection, *args, **kwargs)
+
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def patched_add_update(self, *args, sort=None, **kwargs):
+        # pymongo 4.9+ passes the UpdateOne sort option, which mongomock's bulk builder does not know.
+        return add_update(self, *args, **kwargs)
+
+    mongomock.collection.Collection.find = patched_find
+    mongomock.collection.Collection.find_one = patched_find_one
+    mongomock.collection.BulkOperationBuilder.add_update = patched_add_update
+
+
+def start_in_process(args):
+    """Seeds mongomock, starts the fake TMDB and serves the app on a free port; returns (base URL, movies, tmdb server)."""
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("--in-process needs mongomock: pip install mongomock")
+    import pymongo
+    pymongo.MongoClient = mongomock.MongoClient  # before bot imports it
+    _patch_mongomock(mongomock)
+    # The server's per-request access log would drown the results.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    tmdb_server = fake_tmdb.start(latency_ms=args.tmdb_latency_ms, jitter_ms=args.tmdb_jitter_ms)
+    workdir = tempfile.mkdtemp(prefix="moviezone-bench-")
+    os.environ.update({
+        "MONGO_URI": "mongodb://localhost/bench",
+        "MONGO_DB_NAME": BENCH_DB,
+        "TMDB_API_KEY": "bench",
+        "TMDB_BASE_URL": tmdb_server.url,
+        "TMDB_CACHE_PATH": os.path.join(workdir, "tmdb_cache.sqlite3"),
+        "POSTER_CACHE_DIR": os.path.join(workdir, "posters"),
+        # Over-budget request logging would flood the output.
+        "TRACE_MAX_QUERIES": "0",
+        "TRACE_SLOW_MS": "0",
+    })
+    import bot
+    from serve import PooledWSGIServer
+    seed_collection(bot.movies, parse_size(args.size), args.seed)
+    bot.ensure_indexes()
+    bot.catalog_changed()
+    server = PooledWSGIServer("127.0.0.1", 0, bot.app, args.server_threads, fd=None)
+    threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.port}", bot.movies, tmdb_server
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# --- Reports ---
+
+def print_table(routes):
+    print(f"{'route':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}{'RSS MB':>9}")
+    for name, r in routes.items():
+        print(f"{name:<16}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['throughput_rps']:>10}"
+              f"{r['errors']:>8}{str(r['rss_mb_peak']):>9}")
+
+
+def _change(old, new):
+    if old == new:
+        return f"{old} (same)"
+    if old is None or new is None:
+        return f"{str(old)} -> {str(new)}"
+    pct = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+    return f"{old} -> {new} ({pct})"
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old_path} ({old['meta'].get('commit')}, {old['meta'].get('catalog_titles')} titles)")
+    print(f"new: {new_path} ({new['meta'].get('commit')}, {new['meta'].get('catalog_titles')} titles)")
+    for name in [r for r in old["routes"] if r in new["routes"]]:
+        a, b = old["routes"][name], new["routes"][name]
+        print(f"\n{name}")
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "errors", "rss_mb_peak"):
+            print(f"  {key:<15}{_change(a.get(key), b.get(key))}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        if len(argv) != 3:
+            sys.exit("Usage: python -m bench.run compare <old.json> <new.json>")
+        return compare(argv[1], argv[2])
+
+    parser = argparse.ArgumentParser(description="Benchmark MovieZone routes.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--target", help="base URL of a running server, e.g. http://127.0.0.1:5000")
+    mode.add_argument("--in-process", action="store_true", help="seed mongomock and serve the app from this process")
+    parser.add_argument("--pid", type=int, help="server (serve.py master) pid whose process tree RSS is sampled")
+    parser.add_argument("--size", default="1k", help="catalog size: seeded with --in-process, recorded with --target")
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma separated subset of: {', '.join(ROUTES)}")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per route")
+    parser.add_argument("--write-requests", type=int, default=20, help="timed requests for admin_add and import")
+    parser.add_argument("--import-rows", type=int, default=20, help="titles per import request")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server-threads", type=int, default=8, help="--in-process server pool size")
+    parser.add_argument("--tmdb-latency-ms", type=float, default=100, help="--in-process fake TMDB latency")
+    parser.add_argument("--tmdb-jitter-ms", type=float, default=20)
+    parser.add_argument("--output", help="result file (default bench/results/<time>-<size>-c<concurrency>.json)")
+    args = parser.parse_args(argv)
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+
+    if args.in_process:
+        base_url, collection, tmdb_server = start_in_process(args)
+        pid = os.getpid()
+    else:
+        from dotenv import load_dotenv
+        from pymongo import MongoClient
+        load_dotenv()
+        base_url, tmdb_server = args.target.rstrip("/"), None
+        collection = MongoClient(os.getenv("MONGO_URI"))[os.getenv("MONGO_DB_NAME", BENCH_DB)]["movies"]
+        pid = args.pid
+    samples = load_samples(collection)
+    samples.update(run=time.strftime("%Y%m%d%H%M%S"), import_rows=args.import_rows)
+
+    meta = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "mode": "in-process" if args.in_process else "target",
+        "target": base_url,
+        "size": args.size,
+        "catalog_titles": len(samples["ids"]),
+        "series": len(samples["series"]),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "write_requests": args.write_requests,
+        "import_rows": args.import_rows,
+        "seed": args.seed,
+        "rss_of": "this process" if args.in_process else (f"pid {pid} and children" if pid else None),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+    if args.in_process:
+        meta.update(server_threads=args.server_threads, tmdb_latency_ms=args.tmdb_latency_ms, tmdb_jitter_ms=args.tmdb_jitter_ms)
+    print(f"Benchmarking {base_url}: {meta['catalog_titles']} titles, {args.concurrency} concurrent, {args.requests} requests per route.")
+
+    results = {}
+    for name in routes:
+        results[name] = run_route(base_url, name, samples, args, pid)
+        r = results[name]
+        print(f"  {name}: p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, p99 {r['p99_ms']} ms, "
+              f"{r['throughput_rps']} req/s, {r['errors']} errors")
+    if tmdb_server:
+        meta["tmdb_requests"] = tmdb_server.counters["requests"]
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{args.size}-c{args.concurrency}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"meta": meta, "routes": results}, f, indent=2)
+    print()
+    print_table(results)
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Synthetic catalogs for benchmarking MovieZone.
+
+A seeded RNG draws the titles, genres, badges and series lengths, so the same
+size and seed always give the same catalog. Genres and badges follow a
+skewed, catalog-like mix. Most series are 6-24 episodes long, some run to a
+few hundred, and 1% are long daily shows with 500+ episodes. Documents have
+the shape the app writes after TMDB enrichment, and their `related` lists
+are already computed, so a run needs no TMDB calls and no rebuild first.
+
+Run from the repository root:
+
+  python -m bench.seed 10k --db moviezone_bench     # server from MONGO_URI
+  python -m bench.seed 100k --db moviezone_bench --seed 7
+
+The movies collection of the --db database is dropped and replaced. The
+database must be named explicitly, and bot.py's default database (movie_db)
+is refused, so an exported MONGO_DB_NAME can never pick production.
+"""
+import argparse
+import os
+import random
+import string
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from related_titles import compute_related
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+BENCH_DB = "moviezone_bench"
+PRODUCTION_DB = "movie_db"  # bot.py's default MONGO_DB_NAME
+
+# (value, weight)
+GENRES = [
+    ("Drama", 30), ("Action", 22), ("Comedy", 20), ("Thriller", 16), ("Romance", 12), ("Crime", 11),
+    ("Horror", 9), ("Adventure", 9), ("Sci-Fi", 7), ("Animation", 6), ("Fantasy", 6), ("Mystery", 6),
+    ("Family", 5), ("Documentary", 4), ("History", 3), ("War", 2), ("Music", 2), ("Western", 1),
+]
+BADGES = [
+    ("", 55), ("HD", 12), ("4K", 8), ("Dual Audio", 8), ("Hindi Dubbed", 6), ("WEB-DL", 5),
+    ("Bangla Dubbed", 3), ("New Episode", 3),
+]
+TITLE_WORDS = [
+    "Silent", "Broken", "Last", "Hidden", "Crimson", "Midnight", "Golden", "Lost", "Wild", "Dark",
+    "Frozen", "Secret", "Burning", "Endless", "Fallen", "Iron", "Shadow", "Electric", "Savage", "Quiet",
+]
+TITLE_NOUNS = [
+    "River", "Kingdom", "Empire", "Code", "Horizon", "Station", "Garden", "Protocol", "Harbor", "Signal",
+    "Throne", "Witness", "Frontier", "Legacy", "Circuit", "Heist", "Promise", "Storm", "Tide", "Village",
+]
+SERIES_SHARE = 0.25
+TRENDING_SHARE = 0.03
+COMING_SOON_SHARE = 0.02
+
+
+def parse_size(value):
+    """"10k" -> 10000; plain numbers are taken as-is."""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _key(rng, length=11):
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(length))
+
+
+def episode_count(rng):
+    roll = rng.random()
+    if roll < 0.01:
+        return rng.randint(500, 1500)
+    if roll < 0.10:
+        return rng.randint(50, 300)
+    return rng.randint(6, 24)
+
+
+def make_title(rng, i):
+    content_type = "series" if rng.random() < SERIES_SHARE else "movie"
+    title = f"{rng.choice(['', 'The '])}{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_NOUNS)}"
+    if rng.random() < 0.3:
+        title += f" {rng.randint(2, 5)}"
+    genres = []
+    while len(genres) < rng.choice((1, 2, 2, 3)):
+        genre = _pick(rng, GENRES)
+        if genre not in genres:
+            genres.append(genre)
+    slug = f"{title.lower().replace(' ', '-')}-{i}"
+    released = datetime(1980, 1, 1) + timedelta(days=rng.randint(0, 46 * 365))
+    trailer_key = _key(rng) if rng.random() < 0.85 else None
+    movie = {
+        "title": f"{title} ({released.year})",
+        "type": content_type,
+        "is_trending": rng.random() < TRENDING_SHARE,
+        "is_coming_soon": rng.random() < COMING_SOON_SHARE,
+        "poster_badge": _pick(rng, BADGES),
+        "poster": f"https://image.tmdb.org/t/p/w500/{_key(rng, 27)}.jpg" if rng.random() < 0.95 else "",
+        "overview": " ".join(rng.choice(TITLE_WORDS + TITLE_NOUNS).lower() for _ in range(rng.randint(20, 60))).capitalize() + ".",
+        "release_date": released.strftime("%Y-%m-%d"),
+        "genres": genres,
+        "tmdb_id": 100000 + i,
+        "vote_average": round(rng.uniform(4.0, 9.0), 1),
+        "trailer_key": trailer_key,
+        "trailer_checked_at": datetime.utcnow(),
+        "enrichment_status": "done",
+    }
+    if content_type == "movie":
+        movie["watch_link"] = f"https://stream.example/{slug}"
+        movie["links"] = [{"quality": quality, "url": f"https://dl.example/{slug}/{quality}"}
+                          for quality in ("480p", "720p", "1080p") if rng.random() < 0.7]
+    else:
+        episodes = [{"episode_number": n, "title": f"Episode {n}", "watch_link": f"https://stream.example/{slug}/e{n}",
+                     "links": [{"quality": "720p", "url": f"https://dl.example/{slug}/e{n}/720p"}]}
+                    for n in range(1, episode_count(rng) + 1)]
+        for episode in episodes:
+            if rng.random() < 0.2:
+                episode["overview"] = f"Chapter {episode['episode_number']} of {title}."
+        movie["episodes"] = episodes
+        movie["episode_count"] = len(episodes)
+    return movie
+
+
+def make_catalog(count, seed=42):
+    """Returns `count` movie documents, oldest first, with ids and `related` filled in."""
+    rng = random.Random(seed)
+    docs = {}
+    for i in range(count):
+        movie = make_title(rng, i)
+        movie["_id"] = ObjectId()
+        docs[movie["_id"]] = movie
+    for doc_id, related in compute_related(docs):
+        docs[doc_id]["related"] = related
+    return list(docs.values())
+
+
+def seed_collection(collection, count, seed=42, batch_size=1000):
+    """Replaces the contents of `collection` with a synthetic catalog; returns the number of titles."""
+    started = time.monotonic()
+    docs = make_catalog(count, seed)
+    print(f"Generated {len(docs)} titles in {time.monotonic() - started:.1f}s.")
+    collection.drop()
+    for i in range(0, len(docs), batch_size):
+        collection.insert_many(docs[i:i + batch_size], ordered=False)
+    episodes = sum(doc.get("episode_count", 0) for doc in docs)
+    print(f"Seeded {len(docs)} titles ({episodes} episodes) in {time.monotonic() - started:.1f}s.")
+    return len(docs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a local MongoDB with a synthetic MovieZone catalog.")
+    parser.add_argument("size", help="1k, 10k, 100k or a number of titles")
+    parser.add_argument("--db", required=True, help=f"database to replace the catalog of, e.g. {BENCH_DB}")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    if args.db == PRODUCTION_DB:
+        parser.error(f"refusing to replace the catalog of {PRODUCTION_DB}, bot.py's default database")
+    # Set, not setdefault: an exported MONGO_DB_NAME must not choose the database to drop.
+    os.environ["MONGO_DB_NAME"] = args.db
+    import bot  # after MONGO_DB_NAME is set
+    seed_collection(bot.movies, parse_size(args.size), args.seed)
+    bot.ensure_indexes()
+    # Running servers see the new version within CATALOG_VERSION_TTL and drop their caches.
+    bot.catalog_changed()
+    print(f"Catalog ready in database {bot.MONGO_DB_NAME}.")
+
+
+if __name__ == "__main__":
+    main()
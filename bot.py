@@ -1,15 +1,37 @@
-from flask import Flask, render_template_string, request, redirect, url_for, Response
-from pymongo import MongoClient
+from flask import Flask, render_template, request, redirect, url_for, Response, jsonify, make_response, g, send_file
+from jinja2 import BaseLoader, FileSystemBytecodeCache, TemplateNotFound
+from pymongo import MongoClient, ReturnDocument, UpdateMany, DeleteMany
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId
-import requests, os
+import requests, os, sys, hashlib
 from functools import wraps
 from dotenv import load_dotenv
-from datetime import datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+from datetime import datetime, timedelta, timezone
+import threading, time, gzip
+from collections import OrderedDict
+from search_index import build_title_index, build_prefix_index
+from tmdb_client import TMDBClient, TMDB_BASE_URL
+from related_titles import RelatedTitles
+from assets import AssetManifest, IMMUTABLE
+from posters import PosterCache, POSTER_WIDTHS
+from bulk_import import BulkImporter, read_rows, open_text
+from job_queue import JobQueue
+from ratelimit import KeyedRateLimiter
+from feedback_writer import BufferedWriter, duplicate_key
+from episodes import normalize_episodes, episode_ranges
+from metrics import Metrics, MongoCommandMetrics
+from tracing import RequestTracer
 
 # .env ফাইল থেকে এনভায়রনমেন্ট ভেরিয়েবল লোড করুন
 load_dotenv()
 
 app = Flask(__name__)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Environment variables
 MONGO_URI = os.getenv("MONGO_URI")
@@ -44,260 +66,321 @@ if not MONGO_URI:
 if not TMDB_API_KEY:
     print("Warning: TMDB_API_KEY is not set. Movie details will not be auto-fetched.")
 
-# Database connection
-try:
-    client = MongoClient(MONGO_URI)
-    db = client["movie_db"]
-    movies = db["movies"]
-    settings = db["settings"]
-    feedback = db["feedback"]
-    print("Successfully connected to MongoDB!")
-except Exception as e:
-    print(f"Error connecting to MongoDB: {e}. Exiting.")
-    exit(1)
+# === Metrics: Prometheus ফরম্যাটে /metrics ===
+metrics = Metrics(snapshot_dir=os.getenv("METRICS_DIR"))
+metrics.describe("http_requests_total", "counter", "HTTP requests by route, method and status.")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route and method.")
+metrics.describe("mongo_command_duration_seconds", "histogram", "MongoDB command latency by collection and command.")
+metrics.describe("mongo_command_errors_total", "counter", "Failed MongoDB commands by collection and command.")
+metrics.describe("tmdb_requests_total", "counter", "TMDB lookups by endpoint and outcome (hit = served from the local cache).")
+metrics.describe("tmdb_request_duration_seconds", "histogram", "Latency of TMDB HTTP calls by endpoint.")
+mongo_metrics = MongoCommandMetrics(metrics)
+
+def observe_tmdb(endpoint, outcome, seconds):
+    metrics.inc("tmdb_requests_total", (("endpoint", endpoint), ("outcome", outcome)))
+    if outcome != "hit":
+        metrics.observe("tmdb_request_duration_seconds", (("endpoint", endpoint),), seconds)
+        tracer.record_http(f"tmdb.{endpoint}", seconds)
+
+def observe_poster(outcome, seconds):
+    tracer.record_http("poster", seconds)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.inc("http_requests_total", (("route", route), ("method", request.method), ("status", str(response.status_code))))
+        metrics.observe("http_request_duration_seconds", (("route", route), ("method", request.method)), time.perf_counter() - started)
+    return response
+
+# === Request tracing: প্রতি রিকোয়েস্টে কত কোয়েরি/HTTP কল হলো ===
+# TRACE_MAX_QUERIES / TRACE_SLOW_MS: requests over either budget are logged (0 = off).
+# PROFILE_SAMPLE_RATE: share of requests run under cProfile (0 = off), optionally only the
+# route rules listed in PROFILE_ROUTES (comma separated, e.g. "/,/movie/<movie_id>").
+# TRACE_HEADERS=true adds X-DB-Queries / Server-Timing to requests that carry the admin login;
+# anonymous clients never see them.
+TRACE_HEADERS = os.getenv("TRACE_HEADERS", "false").lower() == "true"
+tracer = RequestTracer(
+    max_queries=int(os.getenv("TRACE_MAX_QUERIES", 10)),
+    slow_ms=float(os.getenv("TRACE_SLOW_MS", 500)),
+    profile_rate=float(os.getenv("PROFILE_SAMPLE_RATE", 0)),
+    profile_dir=os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "profiles")),
+    profile_routes=[r.strip() for r in os.getenv("PROFILE_ROUTES", "").split(",") if r.strip()],
+    profile_keep=int(os.getenv("PROFILE_KEEP", 50)),
+)
+
+@app.before_request
+def start_trace():
+    tracer.start(request.url_rule.rule if request.url_rule else "unmatched")
+
+@app.after_request
+def finish_trace(response):
+    trace = tracer.finish()
+    if trace is not None:
+        auth = request.authorization
+        if TRACE_HEADERS and auth and check_auth(auth.username, auth.password):
+            response.headers.update(tracer.headers(trace))
+        tracer.check_budget(trace, f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code}")
+    return response
+
+@app.teardown_request
+def discard_trace(exc):
+    # after_request is skipped if the response could not be built; never leave a profiler running.
+    tracer.finish()
+
+tmdb = TMDBClient(
+    TMDB_API_KEY,
+    cache_path=os.getenv("TMDB_CACHE_PATH", "tmdb_cache.sqlite3"),
+    max_entries=int(os.getenv("TMDB_CACHE_MAX_ENTRIES", 50000)),
+    rate_limit=float(os.getenv("TMDB_RATE_LIMIT", 40)),
+    base_url=os.getenv("TMDB_BASE_URL", TMDB_BASE_URL),
+    observer=observe_tmdb,
+)
 
+# Database connection
+# MongoClient starts background threads and sockets that must not cross a fork, so every
+# process (e.g. each worker of serve.py) opens its own client on first use.
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "movie_db")
+_mongo = {"pid": None, "client": None}
+_mongo_lock = threading.Lock()
+
+def get_db():
+    if _mongo["pid"] != os.getpid():
+        with _mongo_lock:
+            if _mongo["pid"] != os.getpid():
+                _mongo["client"] = MongoClient(MONGO_URI, event_listeners=[mongo_metrics, tracer.listener])
+                _mongo["pid"] = os.getpid()
+                print(f"Connected to MongoDB (pid {os.getpid()}).")
+    return _mongo["client"][MONGO_DB_NAME]
+
+class LazyCollection:
+    """Stands in for a pymongo Collection and resolves it through get_db() on every use."""
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+movies = LazyCollection("movies")
+settings = LazyCollection("settings")
+feedback = LazyCollection("feedback")
+meta = LazyCollection("meta")
+jobs = LazyCollection("jobs")
+import_uploads = LazyCollection("import_uploads")
+
+
+# === In-process cache: একবার তৈরি করা ডেটা TTL পর্যন্ত মেমোরিতে রাখা হয় ===
+class CachedValue:
+    """
+    Holds the result of `loader()` in memory until it expires or is invalidated.
+    `version` goes up every time the value is reloaded.
+    """
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._value = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        self.refreshing = False
+        self._refresh_again = False
+        self._refresh_lock = threading.Lock()
+
+    def get(self):
+        if time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._value
+        with self._lock:
+            # Another thread may have rebuilt the value while we waited for the lock.
+            if time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            self._value = self.loader()
+            self._expires_at = time.monotonic() + self.ttl
+            self.version += 1
+            return self._value
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+            self.version += 1
+
+    def invalidate(self):
+        self._expires_at = 0
+
+    def refresh_in_background(self, delay=0):
+        """
+        Reloads the value on a thread after `delay` seconds while get() keeps returning the
+        old one. Calls during a refresh are folded into one more reload after it.
+        """
+        if not self._expires_at: return  # not loaded yet or invalidated: the next get() loads it
+        with self._refresh_lock:
+            if self.refreshing:
+                self._refresh_again = True
+                return
+            self.refreshing = True
+        threading.Thread(target=self._refresh, args=(delay,), name="cache-refresh", daemon=True).start()
+
+    def _refresh(self, delay):
+        while True:
+            time.sleep(delay)
+            try:
+                self.set(self.loader())
+            except Exception as e:
+                print(f"Background refresh failed: {e}")
+            with self._refresh_lock:
+                if not self._refresh_again:
+                    self.refreshing = False
+                    return
+                self._refresh_again = False
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "ttl": self.ttl, "version": self.version, "refreshing": self.refreshing}
+
+HOME_FEED_TTL = int(os.getenv("HOME_FEED_TTL", 300))
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", 48))
+SEARCH_INDEX_REFRESH = int(os.getenv("SEARCH_INDEX_REFRESH", 3600))
+SEARCH_INDEX_SYNC_DELAY = float(os.getenv("SEARCH_INDEX_SYNC_DELAY", 5))
+SEARCH_RESULT_LIMIT = 500
+SUGGEST_LIMIT = 8
+TRAILER_RECHECK_DAYS = int(os.getenv("TRAILER_RECHECK_DAYS", 7))
+TRAILER_REFRESH_HOURS = float(os.getenv("TRAILER_REFRESH_HOURS", 24))
+TRAILER_CLAIM_INTERVAL = int(os.getenv("TRAILER_CLAIM_INTERVAL", 600))
+SETTINGS_TTL = int(os.getenv("SETTINGS_TTL", 60))
+CATALOG_VERSION_TTL = int(os.getenv("CATALOG_VERSION_TTL", 5))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+PAGE_CACHE_ENTRIES = int(os.getenv("PAGE_CACHE_ENTRIES", 512))
+EPISODE_PAGE_SIZE = int(os.getenv("EPISODE_PAGE_SIZE", 50))
+
+# List views only render cards, so they never pull `episodes`, `links` or `overview` from Mongo.
+CARD_FIELDS = {"title": 1, "poster": 1, "poster_badge": 1}
+HERO_FIELDS = dict(CARD_FIELDS, overview=1, watch_link=1, is_coming_soon=1)
+
+
+# === Indexes: প্রতিটি লিস্ট কুয়েরির filter+sort অনুযায়ী ইনডেক্স ===
+# Filters of the listing routes. Every one of them is sorted by `_id` descending.
+LIST_QUERIES = {
+    "trending_movies": {"is_trending": True, "is_coming_soon": {"$ne": True}},
+    "movies_only": {"type": "movie", "is_coming_soon": {"$ne": True}},
+    "webseries": {"type": "series", "is_coming_soon": {"$ne": True}},
+    "coming_soon": {"is_coming_soon": True},
+    "recently_added_all": {"is_coming_soon": {"$ne": True}},
+}
+
+# Equality fields first, then the `_id` sort key, then the `$ne` range field.
+MOVIE_INDEXES = [
+    [("is_trending", 1), ("_id", -1), ("is_coming_soon", 1)],
+    [("type", 1), ("_id", -1), ("is_coming_soon", 1)],
+    [("is_coming_soon", 1), ("_id", -1)],
+    [("genres", 1), ("_id", -1)],
+    [("poster_badge", 1), ("_id", -1)],
+    [("related._id", 1)],
+    [("title", 1), ("_id", -1)],
+]
+FEEDBACK_INDEXES = [
+    [("timestamp", -1)],
+]
+
+def ensure_indexes():
+    for keys in MOVIE_INDEXES:
+        movies.create_index(keys)
+    for keys in FEEDBACK_INDEXES:
+        feedback.create_index(keys)
+    movies.create_index([("enrichment_status", 1)], sparse=True)
+    enrichment_queue.ensure_indexes()
+    feedback.create_index("dedup_key", unique=True, sparse=True)
+    print("Indexes are in place.")
+
+def _plan_stages(plan):
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+def check_query_plans():
+    """Explains every catalog query and returns the ones that scan the collection or sort in memory."""
+    sample_genre = next((g for g in movies.distinct("genres") if g), "Action")
+    sample_badge = next((b for b in movies.distinct("poster_badge") if b), "4K")
+    shapes = [(name, movies.find(query).sort('_id', -1)) for name, query in LIST_QUERIES.items()]
+    shapes += [
+        ("movies_by_genre", movies.find({"genres": sample_genre}).sort('_id', -1)),
+        ("movies_by_badge", movies.find({"poster_badge": sample_badge}).sort('_id', -1)),
+        ("related_candidates", movies.find({"genres": {"$in": [sample_genre]}, "_id": {"$ne": ObjectId()}}).sort('_id', -1).limit(2000)),
+        ("related_backrefs", movies.find({"related._id": ObjectId()})),
+        ("feedback", feedback.find().sort('timestamp', -1)),
+    ]
+    failures = []
+    for name, cursor in shapes:
+        stages = _plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        bad = [stage for stage in stages if stage in ("COLLSCAN", "SORT")]
+        print(f"{'FAIL' if bad else 'OK':4}  {name}: {' <- '.join(stages)}")
+        if bad:
+            failures.append(name)
+    return failures
+
+
+# Ad codes change rarely; save_ads() invalidates the cache and the TTL covers edits made by other processes.
+settings_cache = CachedValue(lambda: settings.find_one() or {}, ttl=SETTINGS_TTL)
 
 # === Context Processor: সমস্ত টেমপ্লেটে বিজ্ঞাপনের কোড সহজলভ্য করার জন্য ===
 @app.context_processor
 def inject_ads():
-    ad_codes = settings.find_one()
-    return dict(ad_settings=(ad_codes or {}))
+    return dict(ad_settings=settings_cache.get())
 
 
 # --- START OF index_html TEMPLATE (MODIFIED) ---
 index_html = """
+{%- macro render_movie_card(m) %}
+    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
+      <div class="poster-container">
+        {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
+        <img class="movie-poster" loading="lazy" src="{{ poster_src(m.poster, 342) }}"{% if m.poster %} srcset="{{ poster_srcset(m.poster) }}" sizes="(max-width: 768px) 33vw, 220px"{% endif %} alt="{{ m.title }}">
+      </div>
+      <h4 class="card-title">{{ m.title }}</h4>
+    </a>
+{%- endmacro %}
+{%- if is_partial %}
+{% for m in movies %}{{ render_movie_card(m) }}{% endfor %}
+{% if next_url %}<a href="{{ next_url }}" class="load-more">Load More</a>{% endif %}
+{%- else %}
 <!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>MovieZone - Your Entertainment Hub</title>
-<style>
-  @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
-  :root {
-      --netflix-red: #E50914; --netflix-black: #141414;
-      --text-light: #f5f5f5; --text-dark: #a0a0a0;
-      --nav-height: 60px;
-  }
-  * { box-sizing: border-box; margin: 0; padding: 0; }
-  body {
-    font-family: 'Roboto', sans-serif; background-color: var(--netflix-black);
-    color: var(--text-light); overflow-x: hidden;
-  }
-  a { text-decoration: none; color: inherit; }
-  ::-webkit-scrollbar { width: 8px; }
-  ::-webkit-scrollbar-track { background: #222; }
-  ::-webkit-scrollbar-thumb { background: #555; }
-  ::-webkit-scrollbar-thumb:hover { background: var(--netflix-red); }
-
-  .main-nav {
-      position: fixed; top: 0; left: 0; width: 100%; padding: 15px 50px;
-      display: flex; justify-content: space-between; align-items: center; z-index: 100;
-      transition: background-color 0.3s ease;
-      background: linear-gradient(to bottom, rgba(0,0,0,0.8) 10%, rgba(0,0,0,0));
-  }
-  .main-nav.scrolled { background-color: var(--netflix-black); }
-  .logo {
-      font-family: 'Bebas Neue', sans-serif; font-size: 32px; color: var(--netflix-red);
-      font-weight: 700; letter-spacing: 1px;
-  }
-  .search-input {
-      background-color: rgba(0,0,0,0.7); border: 1px solid #777;
-      color: var(--text-light); padding: 8px 15px; border-radius: 4px;
-      transition: width 0.3s ease, background-color 0.3s ease; width: 250px;
-  }
-  .search-input:focus { background-color: rgba(0,0,0,0.9); border-color: var(--text-light); outline: none; }
-
-  .tags-section {
-    padding: 80px 50px 20px 50px;
-    background-color: var(--netflix-black);
-  }
-  .tags-container {
-    display: flex; flex-wrap: wrap;
-    justify-content: center;
-    gap: 10px;
-  }
-  .tag-link {
-    padding: 6px 16px;
-    background-color: rgba(255, 255, 255, 0.1);
-    border: 1px solid #444; border-radius: 50px;
-    font-weight: 500; font-size: 0.85rem;
-    transition: background-color 0.3s, border-color 0.3s, color 0.3s;
-  }
-  .tag-link:hover { background-color: var(--netflix-red); border-color: var(--netflix-red); color: white; }
-
-  .hero-section { height: 85vh; position: relative; color: white; overflow: hidden; }
-  .hero-slide {
-      position: absolute; top: 0; left: 0; width: 100%; height: 100%;
-      background-size: cover; background-position: center top;
-      display: flex; align-items: flex-end; padding: 50px;
-      opacity: 0; transition: opacity 1.5s ease-in-out; z-index: 1;
-  }
-  .hero-slide.active { opacity: 1; z-index: 2; }
-  .hero-slide::before {
-      content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0;
-      background: linear-gradient(to top, var(--netflix-black) 10%, transparent 50%),
-                  linear-gradient(to right, rgba(0,0,0,0.8) 0%, transparent 60%);
-  }
-  .hero-content { position: relative; z-index: 3; max-width: 50%; }
-  .hero-title { font-family: 'Bebas Neue', sans-serif; font-size: 5rem; font-weight: 700; margin-bottom: 1rem; line-height: 1; }
-  .hero-overview {
-      font-size: 1.1rem; line-height: 1.5; margin-bottom: 1.5rem; max-width: 600px;
-      display: -webkit-box; -webkit-line-clamp: 3; -webkit-box-orient: vertical; overflow: hidden;
-  }
-  .hero-buttons .btn {
-      padding: 8px 20px;
-      margin-right: 0.8rem;
-      border: none; border-radius: 4px;
-      font-size: 0.9rem;
-      font-weight: 700; cursor: pointer; transition: opacity 0.3s ease;
-      display: inline-flex; align-items: center; gap: 8px;
-  }
-  .btn.btn-primary { background-color: var(--netflix-red); color: white; }
-  .btn.btn-secondary { background-color: rgba(109, 109, 110, 0.7); color: white; }
-  .btn:hover { opacity: 0.8; }
-
-  main { padding-top: 0; }
-  .content-section { padding: 30px 50px; }
-  .section-header {
-      display: flex; justify-content: space-between; align-items: center;
-      margin-bottom: 20px;
-  }
-  .section-title { font-family: 'Roboto', sans-serif; font-weight: 700; font-size: 1.6rem; margin: 0; }
-  .see-all-link { color: var(--text-dark); font-weight: 700; font-size: 0.9rem; }
-  
-  .movie-grid {
-      display: grid;
-      grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-      gap: 25px 15px;
-  }
-
-  .movie-card {
-      background-color: transparent;
-      cursor: pointer;
-      display: block;
-      transition: transform 0.2s ease-in-out;
-  }
-  .movie-card:hover { transform: scale(1.04); }
-  .poster-container {
-    position: relative;
-    border-radius: 4px; overflow: hidden;
-    margin-bottom: 10px;
-    box-shadow: 0 4px 10px rgba(0,0,0,0.3);
-  }
-  .movie-poster {
-      width: 100%;
-      aspect-ratio: 2 / 3;
-      object-fit: cover;
-      display: block;
-      background-color: #222;
-  }
-  .poster-badge {
-    position: absolute; top: 10px; left: 10px; background-color: var(--netflix-red);
-    color: white; padding: 5px 10px; font-size: 12px; font-weight: 700;
-    border-radius: 4px; z-index: 3; box-shadow: 0 2px 5px rgba(0,0,0,0.5);
-  }
-  .card-title {
-      font-size: 0.95rem; font-weight: 500;
-      color: var(--text-light);
-      white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
-      text-align: left;
-  }
-  
-  .full-page-grid-container { padding: 100px 50px 50px 50px; }
-  .full-page-grid-title { font-size: 2.5rem; font-weight: 700; margin-bottom: 30px; }
-  
-  .bottom-nav {
-      display: none; position: fixed; bottom: 0; left: 0; right: 0;
-      height: var(--nav-height); background-color: #181818;
-      border-top: 1px solid #282828; justify-content: space-around;
-      align-items: center; z-index: 200;
-  }
-  .nav-item {
-      display: flex; flex-direction: column; align-items: center;
-      color: var(--text-dark); font-size: 10px; flex-grow: 1;
-      padding: 5px 0; transition: color 0.2s ease;
-  }
-  .nav-item i { font-size: 20px; margin-bottom: 4px; }
-  .nav-item.active { color: var(--text-light); }
-  .nav-item.active .fa-home, .nav-item.active .fa-envelope, .nav-item.active .fa-layer-group { color: var(--netflix-red); }
-  .ad-container { margin: 25px 50px; display: flex; justify-content: center; align-items: center; }
-
-  .telegram-join-section {
-    background-color: #181818; padding: 40px 20px;
-    margin-top: 50px; text-align: center;
-  }
-  .telegram-join-section .telegram-icon {
-    font-size: 4rem; color: #2AABEE; margin-bottom: 15px;
-  }
-  .telegram-join-section h2 {
-    font-family: 'Bebas Neue', sans-serif; font-size: 2.5rem;
-    color: var(--text-light); margin-bottom: 10px;
-  }
-  .telegram-join-section p {
-    font-size: 1.1rem; color: var(--text-dark); max-width: 600px;
-    margin: 0 auto 25px auto;
-  }
-  .telegram-join-button {
-    display: inline-flex; align-items: center; gap: 10px;
-    background-color: #2AABEE; color: white;
-    padding: 12px 30px; border-radius: 50px;
-    font-size: 1.1rem; font-weight: 700;
-    transition: transform 0.2s ease, background-color 0.2s ease;
-  }
-  .telegram-join-button:hover { transform: scale(1.05); background-color: #1e96d1; }
-  .telegram-join-button i { font-size: 1.3rem; }
-
-  @media (max-width: 768px) {
-      body { padding-bottom: var(--nav-height); }
-      .main-nav { padding: 10px 15px; }
-      .logo { font-size: 24px; }
-      .search-input { width: 150px; }
-      .tags-section { padding: 80px 15px 15px 15px; }
-      .tag-link { padding: 6px 15px; font-size: 0.8rem; }
-      .hero-section { height: 60vh; }
-      .hero-slide { padding: 15px; align-items: center; }
-      .hero-content { max-width: 90%; text-align: center; }
-      .hero-title { font-size: 2.8rem; }
-      .hero-overview { display: none; }
-      .content-section { padding: 25px 15px; }
-      .section-title { font-size: 1.2rem; }
-      .movie-grid { grid-template-columns: repeat(auto-fill, minmax(110px, 1fr)); gap: 15px 10px; }
-      .full-page-grid-container { padding: 80px 15px 30px; }
-      /* The full page grid now uses the standard movie-grid class */
-      .full-page-grid-title { font-size: 1.8rem; }
-      .bottom-nav { display: flex; }
-      .ad-container { margin: 25px 15px; }
-      .telegram-join-section h2 { font-size: 2rem; }
-      .telegram-join-section p { font-size: 1rem; }
-  }
-</style>
+<link rel="stylesheet" href="{{ asset_url('css/base.css') }}">
+<link rel="stylesheet" href="{{ asset_url('css/home.css') }}">
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
 </head>
 <body>
 <header class="main-nav">
   <a href="{{ url_for('home') }}" class="logo">MovieZone</a>
   <form method="GET" action="/" class="search-form">
-    <input type="search" name="q" class="search-input" placeholder="Search..." value="{{ query|default('') }}" />
+    <input type="search" name="q" class="search-input" placeholder="Search..." value="{{ request.args.get('q', '') }}" autocomplete="off" data-suggest-url="{{ url_for('suggest') }}" />
+    <div class="suggest-box"></div>
   </form>
 </header>
 
 <main>
-  {% macro render_movie_card(m) %}
-    <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
-      <div class="poster-container">
-        {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
-        <img class="movie-poster" loading="lazy" src="{{ m.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ m.title }}">
-      </div>
-      <h4 class="card-title">{{ m.title }}</h4>
-    </a>
-  {% endmacro %}
-
   {% if is_full_page_list %}
     <div class="full-page-grid-container">
       <h2 class="full-page-grid-title">{{ query }}</h2>
       {% if movies|length == 0 %}<p style="text-align:center; color: var(--text-dark); margin-top: 40px;">No content found.</p>
       {% else %}<div class="movie-grid">{% for m in movies %}{{ render_movie_card(m) }}{% endfor %}</div>{% endif %}
+      {% if next_url %}<div class="pagination"><a href="{{ next_url }}" class="load-more">Load More</a></div>{% endif %}
     </div>
   {% else %}
     {% if all_badges %}
@@ -310,7 +393,7 @@ index_html = """
     {% if recently_added %}
       <div class="hero-section">
         {% for movie in recently_added %}
-          <div class="hero-slide {% if loop.first %}active{% endif %}" style="background-image: url('{{ movie.poster or '' }}');">
+          <div class="hero-slide {% if loop.first %}active{% endif %}" style="background-image: url('{{ poster_src(movie.poster, 500) if movie.poster else '' }}');">
             <div class="hero-content">
               <h1 class="hero-title">{{ movie.title }}</h1>
               <p class="hero-overview">{{ movie.overview }}</p>
@@ -367,23 +450,12 @@ index_html = """
   <a href="{{ url_for('contact') }}" class="nav-item {% if request.endpoint == 'contact' %}active{% endif %}"><i class="fas fa-envelope"></i><span>Request</span></a>
 </nav>
 
-<script>
-    const nav = document.querySelector('.main-nav');
-    window.addEventListener('scroll', () => { window.scrollY > 50 ? nav.classList.add('scrolled') : nav.classList.remove('scrolled'); });
-
-    document.addEventListener('DOMContentLoaded', function() {
-        const slides = document.querySelectorAll('.hero-slide');
-        if (slides.length > 1) {
-            let currentSlide = 0;
-            const showSlide = (index) => slides.forEach((s, i) => s.classList.toggle('active', i === index));
-            setInterval(() => { currentSlide = (currentSlide + 1) % slides.length; showSlide(currentSlide); }, 5000);
-        }
-    });
-</script>
+<script src="{{ asset_url('js/moviezone.js') }}" defer></script>
 {% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
 {% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
 </body>
 </html>
+{%- endif %}
 """
 # --- END OF index_html TEMPLATE ---
 
@@ -396,45 +468,8 @@ genres_html = """
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>{{ title }} - MovieZone</title>
-<style>
-  @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
-  :root { --netflix-red: #E50914; --netflix-black: #141414; --text-light: #f5f5f5; --text-dark: #a0a0a0; }
-  * { box-sizing: border-box; margin: 0; padding: 0; }
-  body { font-family: 'Roboto', sans-serif; background-color: var(--netflix-black); color: var(--text-light); }
-  a { text-decoration: none; color: inherit; }
-  
-  .main-container { padding: 100px 50px 50px; }
-  .page-title { font-family: 'Bebas Neue', sans-serif; font-size: 3rem; color: var(--netflix-red); margin-bottom: 30px; }
-  .back-button { color: var(--text-light); font-size: 1rem; margin-bottom: 20px; display: inline-block; }
-  .back-button:hover { color: var(--netflix-red); }
-  
-  .genre-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-    gap: 20px;
-  }
-  .genre-card {
-    background: linear-gradient(45deg, #2c2c2c, #1a1a1a);
-    border-radius: 8px;
-    padding: 30px 20px;
-    text-align: center;
-    font-size: 1.4rem;
-    font-weight: 700;
-    transition: transform 0.3s ease, background 0.3s ease;
-    border: 1px solid #444;
-  }
-  .genre-card:hover {
-    transform: translateY(-5px) scale(1.03);
-    background: linear-gradient(45deg, var(--netflix-red), #b00710);
-    border-color: var(--netflix-red);
-  }
-  @media (max-width: 768px) {
-    .main-container { padding: 80px 15px 30px; }
-    .page-title { font-size: 2.2rem; }
-    .genre-grid { grid-template-columns: repeat(auto-fill, minmax(150px, 1fr)); gap: 15px; }
-    .genre-card { font-size: 1.1rem; padding: 25px 15px; }
-  }
-</style>
+<link rel="stylesheet" href="{{ asset_url('css/base.css') }}">
+<link rel="stylesheet" href="{{ asset_url('css/genres.css') }}">
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
 </head>
 <body>
@@ -465,64 +500,15 @@ detail_html = """
 <meta charset="UTF-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=no" />
 <title>{{ movie.title if movie else "Content Not Found" }} - MovieZone</title>
-<style>
-  @import url('https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;500;700&display=swap');
-  :root { --netflix-red: #E50914; --netflix-black: #141414; --text-light: #f5f5f5; --text-dark: #a0a0a0; }
-  * { box-sizing: border-box; margin: 0; padding: 0; }
-  body { font-family: 'Roboto', sans-serif; background: var(--netflix-black); color: var(--text-light); }
-  .detail-header { position: absolute; top: 0; left: 0; right: 0; padding: 20px 50px; z-index: 100; }
-  .back-button { color: var(--text-light); font-size: 1.2rem; font-weight: 700; text-decoration: none; display: flex; align-items: center; gap: 10px; transition: color 0.3s ease; }
-  .back-button:hover { color: var(--netflix-red); }
-  .detail-hero { position: relative; width: 100%; display: flex; align-items: center; justify-content: center; padding: 100px 0; }
-  .detail-hero-background { position: absolute; top: 0; left: 0; right: 0; bottom: 0; background-size: cover; background-position: center; filter: blur(20px) brightness(0.4); transform: scale(1.1); }
-  .detail-hero::after { content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: linear-gradient(to top, rgba(20,20,20,1) 0%, rgba(20,20,20,0.6) 50%, rgba(20,20,20,1) 100%); }
-  .detail-content-wrapper { position: relative; z-index: 2; display: flex; gap: 40px; max-width: 1200px; padding: 0 50px; width: 100%; }
-  .detail-poster { width: 300px; height: 450px; flex-shrink: 0; border-radius: 8px; box-shadow: 0 10px 30px rgba(0,0,0,0.5); object-fit: cover; }
-  .detail-info { flex-grow: 1; max-width: 65%; }
-  .detail-title { font-family: 'Bebas Neue', sans-serif; font-size: 4.5rem; font-weight: 700; line-height: 1.1; margin-bottom: 20px; }
-  .detail-meta { display: flex; flex-wrap: wrap; gap: 20px; margin-bottom: 25px; font-size: 1rem; color: var(--text-dark); }
-  .detail-meta span { font-weight: 700; color: var(--text-light); }
-  .detail-overview { font-size: 1.1rem; line-height: 1.6; margin-bottom: 30px; }
-  .watch-now-btn { background-color: var(--netflix-red); color: white; padding: 15px 30px; font-size: 1.2rem; font-weight: 700; border: none; border-radius: 5px; cursor: pointer; display: inline-flex; align-items: center; gap: 10px; text-decoration: none; margin-bottom: 25px; transition: transform 0.2s ease, background-color 0.2s ease; }
-  .watch-now-btn:hover { transform: scale(1.05); background-color: #f61f29; }
-  .section-title { font-size: 1.5rem; font-weight: 700; margin-bottom: 20px; padding-bottom: 5px; border-bottom: 2px solid var(--netflix-red); display: inline-block; }
-  .video-container { position: relative; padding-bottom: 56.25%; height: 0; overflow: hidden; max-width: 100%; background: #000; border-radius: 8px; }
-  .video-container iframe { position: absolute; top: 0; left: 0; width: 100%; height: 100%; }
-  .download-section { margin-top: 30px; }
-  .download-button, .episode-download-button { display: inline-block; padding: 12px 25px; background-color: #444; color: white; text-decoration: none; border-radius: 4px; font-weight: 700; transition: background-color 0.3s ease; margin-right: 10px; margin-bottom: 10px; text-align: center; vertical-align: middle; }
-  .copy-button { background-color: #555; color: white; border: none; padding: 8px 15px; font-size: 0.9rem; cursor: pointer; border-radius: 4px; margin-left: -5px; margin-bottom: 10px; vertical-align: middle; }
-  .episode-item { margin-bottom: 20px; padding-bottom: 15px; border-bottom: 1px solid #333; }
-  .episode-title { font-size: 1.2rem; font-weight: 700; margin-bottom: 8px; color: #fff; }
-  .ad-container { margin: 30px 0; text-align: center; }
-  .related-section-container { padding: 40px 0; background-color: #181818; }
-  .related-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 25px 15px; padding: 0 50px; }
-  .movie-card { width: 100%; border-radius: 4px; overflow: hidden; cursor: pointer; transition: transform 0.3s ease; display: block; position: relative; }
-  .movie-poster { width: 100%; aspect-ratio: 2 / 3; object-fit: cover; display: block; }
-  .poster-badge { position: absolute; top: 10px; left: 10px; background-color: var(--netflix-red); color: white; padding: 5px 10px; font-size: 12px; font-weight: 700; border-radius: 4px; z-index: 3; }
-  .card-title { font-size: 0.95rem; font-weight: 500; color: var(--text-light); white-space: nowrap; overflow: hidden; text-overflow: ellipsis; text-align: left; margin-top: 10px; }
-  
-  @media (hover: hover) { .movie-card:hover { transform: scale(1.05); } }
-  
-  @media (max-width: 992px) {
-    .detail-content-wrapper { flex-direction: column; align-items: center; text-align: center; }
-    .detail-info { max-width: 100%; } .detail-title { font-size: 3.5rem; }
-  }
-  @media (max-width: 768px) {
-    .detail-header { padding: 20px; } .detail-hero { padding: 80px 20px 40px; }
-    .detail-poster { width: 60%; max-width: 220px; height: auto; }
-    .detail-title { font-size: 2.2rem; }
-    .watch-now-btn, .download-button, .episode-download-button, .copy-button { display: block; width: 100%; max-width: 320px; margin: 0 auto 10px auto; }
-    .section-title { margin-left: 15px !important; } .related-section-container { padding: 20px 0; }
-    .related-grid { grid-template-columns: repeat(auto-fill, minmax(110px, 1fr)); gap: 15px 10px; padding: 0 15px; }
-  }
-</style>
+<link rel="stylesheet" href="{{ asset_url('css/base.css') }}">
+<link rel="stylesheet" href="{{ asset_url('css/detail.css') }}">
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.2.0/css/all.min.css">
 </head>
 <body>
 {% macro render_related_card(m) %}
     <a href="{{ url_for('movie_detail', movie_id=m._id) }}" class="movie-card">
     {% if m.poster_badge %}<div class="poster-badge">{{ m.poster_badge }}</div>{% endif %}
-    <img class="movie-poster" loading="lazy" src="{{ m.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ m.title }}">
+    <img class="movie-poster" loading="lazy" src="{{ poster_src(m.poster, 342) }}"{% if m.poster %} srcset="{{ poster_srcset(m.poster) }}" sizes="(max-width: 768px) 33vw, 220px"{% endif %} alt="{{ m.title }}">
     <h4 class="card-title">{{ m.title }}</h4>
     </a>
 {% endmacro %}
@@ -530,9 +516,9 @@ detail_html = """
 <header class="detail-header"><a href="{{ url_for('home') }}" class="back-button"><i class="fas fa-arrow-left"></i> Back to Home</a></header>
 {% if movie %}
 <div class="detail-hero" style="min-height: auto; padding-bottom: 60px;">
-  <div class="detail-hero-background" style="background-image: url('{{ movie.poster }}');"></div>
+  <div class="detail-hero-background" style="background-image: url('{{ poster_src(movie.poster, 185) if movie.poster else '' }}');"></div>
   <div class="detail-content-wrapper">
-    <img class="detail-poster" src="{{ movie.poster or 'https://via.placeholder.com/400x600.png?text=No+Image' }}" alt="{{ movie.title }}">
+    <img class="detail-poster" src="{{ poster_src(movie.poster, 500) }}"{% if movie.poster %} srcset="{{ poster_srcset(movie.poster) }}" sizes="(max-width: 768px) 60vw, 300px"{% endif %} alt="{{ movie.title }}">
     <div class="detail-info">
       <h1 class="detail-title">{{ movie.title }}</h1>
       <div class="detail-meta">
@@ -549,7 +535,7 @@ detail_html = """
       <div class="download-section">
         {% if movie.is_coming_soon %}<h3 class="section-title">Coming Soon</h3>
         {% elif movie.type == 'movie' and movie.links %}<h3 class="section-title">Download Links</h3>{% for link_item in movie.links %}<div><a class="download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }} [{{ link_item.size or 'N/A' }}]</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i> Copy</button></div>{% endfor %}
-        {% elif movie.type == 'series' and movie.episodes %}<h3 class="section-title">Episodes</h3>{% for episode in movie.episodes | sort(attribute='episode_number') %}<div class="episode-item"><h4 class="episode-title">E{{ episode.episode_number }}: {{ episode.title }}</h4>{% if episode.overview %}<p class="episode-overview-text">{{ episode.overview }}</p>{% endif %}{% if episode.watch_link %}<a href="{{ url_for('watch_movie', movie_id=movie._id, ep=episode.episode_number) }}" class="episode-download-button" style="background-color: var(--netflix-red);"><i class="fas fa-play"></i> Watch Episode</a>{% endif %}{% if episode.links %}{% for link_item in episode.links %}<div><a class="episode-download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }}</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i></button></div>{% endfor %}{% endif %}</div>{% endfor %}
+        {% elif movie.type == 'series' and movie.episodes %}<h3 class="section-title">Episodes</h3>{% if episode_ranges %}<div class="episode-ranges">{% for page, first, last in episode_ranges %}<a href="{{ url_for('movie_detail', movie_id=movie._id, eps=page) }}" class="episode-range{% if page == episode_page %} active{% endif %}">{{ first }}-{{ last }}</a>{% endfor %}</div>{% endif %}{% for episode in movie.episodes %}<div class="episode-item"><h4 class="episode-title">E{{ episode.episode_number }}: {{ episode.title }}</h4>{% if episode.overview %}<p class="episode-overview-text">{{ episode.overview }}</p>{% endif %}{% if episode.watch_link %}<a href="{{ url_for('watch_movie', movie_id=movie._id, ep=episode.episode_number) }}" class="episode-download-button" style="background-color: var(--netflix-red);"><i class="fas fa-play"></i> Watch Episode</a>{% endif %}{% if episode.links %}{% for link_item in episode.links %}<div><a class="episode-download-button" href="{{ link_item.url }}" target="_blank" rel="noopener"><i class="fas fa-download"></i> {{ link_item.quality }}</a><button class="copy-button" onclick="copyToClipboard('{{ link_item.url }}')"><i class="fas fa-copy"></i></button></div>{% endfor %}{% endif %}</div>{% endfor %}
         {% endif %}
         {% if not movie.links and not movie.episodes and not movie.is_coming_soon %}<p class="no-link-message">No download links available.</p>{% endif %}
       </div>
@@ -565,9 +551,7 @@ detail_html = """
 </div>
 {% endif %}
 {% else %}<div style="display:flex; justify-content:center; align-items:center; height:100vh;"><h2>Content not found.</h2></div>{% endif %}
-<script>
-function copyToClipboard(text) { navigator.clipboard.writeText(text).then(() => alert('Link copied!'), () => alert('Copy failed!')); }
-</script>
+<script src="{{ asset_url('js/moviezone.js') }}" defer></script>
 {% if ad_settings.popunder_code %}{{ ad_settings.popunder_code|safe }}{% endif %}
 {% if ad_settings.social_bar_code %}{{ ad_settings.social_bar_code|safe }}{% endif %}
 </body>
@@ -621,6 +605,13 @@ admin_html = """
     .action-buttons a:hover, .action-buttons button:hover, .delete-btn:hover { opacity: 0.8; }
     .episode-item { border: 1px solid var(--light-gray); padding: 15px; margin-bottom: 15px; border-radius: 5px; }
     hr.section-divider { border: 0; height: 2px; background-color: var(--light-gray); margin: 40px 0; }
+    .status { padding: 3px 8px; border-radius: 4px; font-size: 0.85rem; background: #2e7d32; }
+    .status-pending, .status-retrying { background: #b8860b; } .status-failed { background: #dc3545; cursor: help; }
+    .table-filters { display: flex; flex-wrap: wrap; gap: 10px; } .table-filters input, .table-filters select { width: auto; flex: 1 1 150px; padding: 8px; }
+    th[data-sort] { cursor: pointer; } th[data-sort]::after { content: ' \\2195'; opacity: 0.5; }
+    .bulk-bar { display: none; flex-wrap: wrap; gap: 8px; align-items: center; margin-top: 15px; padding: 10px; background: var(--dark-gray); border-radius: 6px; } .bulk-bar.open { display: flex; }
+    .bulk-bar button { background: var(--light-gray); color: var(--text-light); border: none; padding: 6px 12px; border-radius: 4px; cursor: pointer; } .bulk-bar input { width: auto; padding: 6px; } .bulk-bar button.delete-btn { background: #dc3545; }
+    .pager { display: flex; gap: 10px; align-items: center; margin-top: 10px; } .pager button { background: var(--light-gray); color: var(--text-light); border: none; padding: 6px 12px; border-radius: 4px; cursor: pointer; } .pager button:disabled { opacity: 0.4; cursor: default; }
   </style>
   <link href="https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
 </head>
@@ -654,23 +645,60 @@ admin_html = """
     <button type="submit">Add Content</button>
   </form>
   <hr class="section-divider">
+  <h2>Bulk Import</h2>
+  <form id="import_form">
+    <div class="form-group"><label>CSV or JSON lines file (same field names as the form above; tmdb_id optional):</label><input type="file" name="file" accept=".csv,.jsonl,.json" required /></div>
+    <button type="submit">Start Import</button>
+    <p id="import_status"></p>
+  </form>
+  <hr class="section-divider">
   <h2>Manage Content</h2>
-  <table><thead><tr><th>Title</th><th>Type</th><th>Badge</th><th>Actions</th></tr></thead><tbody>
-    {% for movie in all_content %}<tr><td>{{ movie.title }}</td><td>{{ movie.type | title }}</td><td>{{ movie.poster_badge or 'N/A' }}</td><td class="action-buttons"><a href="{{ url_for('edit_movie', movie_id=movie._id) }}" class="edit-btn">Edit</a><button class="delete-btn" onclick="confirmDelete('{{ movie._id }}', '{{ movie.title }}')">Delete</button></td></tr>{% endfor %}
-  </tbody></table>
-  {% if not all_content %}<p>No content found.</p>{% endif %}
+  {% set counts = admin_data.counts %}
+  <p class="admin-counts">{{ counts.titles }} titles &middot; {{ counts.movies }} movies &middot; {{ counts.series }} series &middot; {{ counts.trending }} trending &middot; {{ counts.coming_soon }} coming soon &middot; {{ counts.enrichment_pending }} waiting for TMDB &middot; {{ counts.enrichment_failed }} TMDB failures</p>
+  <div class="table-filters" id="content_filters">
+    <input type="search" name="q" placeholder="Search titles...">
+    <select name="type"><option value="">All types</option><option value="movie">Movies</option><option value="series">Series</option></select>
+    <select name="badge"><option value="">Any badge</option><option value="none">No badge</option>{% for badge in counts.badges %}<option value="{{ badge }}">{{ badge }}</option>{% endfor %}</select>
+    <select name="trending"><option value="">Trending: any</option><option value="true">Trending</option><option value="false">Not trending</option></select>
+    <select name="coming_soon"><option value="">Coming soon: any</option><option value="true">Coming soon</option><option value="false">Released</option></select>
+    <select name="status"><option value="">TMDB: any</option><option value="pending">Pending</option><option value="retrying">Retrying</option><option value="failed">Failed</option><option value="done">Done</option></select>
+  </div>
+  <div class="bulk-bar" id="bulk_bar">
+    <span id="bulk_count">0 selected</span>
+    <button type="button" data-action="delete" class="delete-btn">Delete</button>
+    <button type="button" data-action="trending" data-value="true">Mark trending</button>
+    <button type="button" data-action="trending" data-value="false">Unmark trending</button>
+    <button type="button" data-action="coming_soon" data-value="true">Mark coming soon</button>
+    <button type="button" data-action="coming_soon" data-value="false">Unmark coming soon</button>
+    <input type="text" id="bulk_badge" placeholder="Badge (e.g. 4K)">
+    <button type="button" data-action="badge">Set badge</button>
+    <button type="button" data-action="badge" data-value="">Clear badge</button>
+  </div>
+  <table id="content_table"><thead><tr><th><input type="checkbox" id="select_all" title="Select page"></th><th data-sort="title">Title</th><th>Type</th><th>Badge</th><th>TMDB</th><th>Actions</th></tr></thead><tbody></tbody></table>
+  <div class="pager" id="content_pager"></div>
   <hr class="section-divider">
   <h2>User Feedback / Reports</h2>
-    {% if feedback_list %}
-    <table><thead><tr><th>Date</th><th>Type</th><th>Title</th><th>Message</th><th>Email</th><th>Action</th></tr></thead><tbody>
-      {% for item in feedback_list %}<tr><td style="min-width: 150px;">{{ item.timestamp.strftime('%Y-%m-%d %H:%M') }}</td><td>{{ item.type }}</td><td>{{ item.content_title }}</td><td style="white-space: pre-wrap; min-width: 300px;">{{ item.message }}</td><td>{{ item.email or 'N/A' }}</td><td><a href="{{ url_for('delete_feedback', feedback_id=item._id) }}" class="delete-btn" onclick="return confirm('Delete this feedback?');">Delete</a></td></tr>{% endfor %}
-    </tbody></table>
-    {% else %}<p>No new feedback or reports.</p>{% endif %}
+  <table id="feedback_table"><thead><tr><th>Date</th><th>Type</th><th>Title</th><th>Message</th><th>Email</th><th>Action</th></tr></thead><tbody></tbody></table>
+  <div class="pager" id="feedback_pager"></div>
+  <script id="admin_data" type="application/json">{{ admin_data | tojson }}</script>
+  <script src="{{ asset_url('js/admin.js') }}"></script>
   <script>
-    function confirmDelete(id, title) { if (confirm('Delete "' + title + '"?')) window.location.href = '/delete_movie/' + id; }
     function toggleEpisodeFields() { var isSeries = document.getElementById('content_type').value === 'series'; document.getElementById('episode_fields').style.display = isSeries ? 'block' : 'none'; document.getElementById('movie_fields').style.display = isSeries ? 'none' : 'block'; }
     function addEpisodeField() { const c = document.getElementById('episodes_container'), d = document.createElement('div'); d.className = 'episode-item'; d.innerHTML = `<div class="form-group"><label>Ep Number:</label><input type="number" name="episode_number[]" required /></div><div class="form-group"><label>Ep Title:</label><input type="text" name="episode_title[]" required /></div><div class="form-group"><label>Watch Link:</label><input type="url" name="episode_watch_link[]" /></div><hr><p>OR Download Links</p><div class="form-group"><label>480p Link:</label><input type="url" name="episode_link_480p[]" /></div><div class="form-group"><label>720p Link:</label><input type="url" name="episode_link_720p[]" /></div><button type="button" onclick="this.parentElement.remove()" class="delete-btn" style="padding: 6px 12px;">Remove Ep</button>`; c.appendChild(d); }
     document.addEventListener('DOMContentLoaded', toggleEpisodeFields);
+    document.getElementById('import_form').addEventListener('submit', async function (e) {
+      e.preventDefault();
+      const status = document.getElementById('import_status');
+      const res = await fetch('{{ url_for('start_import') }}', { method: 'POST', body: new FormData(this) });
+      const job = await res.json();
+      if (!res.ok) { status.textContent = job.error; return; }
+      const poll = async () => {
+        const p = await (await fetch(job.status_url)).json();
+        status.textContent = `${p.rows} rows, ${p.inserted || 0} inserted, ${p.duplicates || 0} duplicates, ${p.failed || 0} failed, ${p.rows_per_sec || 0} rows/s` + (p.error ? ` - ${p.error}` : '');
+        if (p.done) { if (!p.error) status.textContent += ' - done'; } else setTimeout(poll, 2000);
+      };
+      poll();
+    });
   </script>
 </body></html>
 """
@@ -765,6 +793,7 @@ contact_html = """
         button[type="submit"] { background: var(--netflix-red); color: white; font-weight: 700; cursor: pointer; border: none; padding: 12px 25px; border-radius: 4px; font-size: 1.1rem; width: 100%; transition: background 0.3s ease; }
         button[type="submit"]:hover { background: #b00710; }
         .success-message { text-align: center; padding: 20px; background-color: #1f4e2c; color: #d4edda; border-radius: 5px; margin-bottom: 20px; }
+        .error-message { text-align: center; padding: 15px; background-color: #4e1f1f; color: #f8d7da; border-radius: 5px; margin-bottom: 20px; }
         .back-link { display: block; text-align: center; margin-top: 20px; color: var(--netflix-red); text-decoration: none; font-weight: bold; }
     </style>
     <link href="https://fonts.googleapis.com/css2?family=Bebas+Neue&family=Roboto:wght@400;700&display=swap" rel="stylesheet">
@@ -776,6 +805,7 @@ contact_html = """
             <div class="success-message"><p>আপনার বার্তা সফলভাবে পাঠানো হয়েছে। ধন্যবাদ!</p><p>Your message has been sent successfully. Thank you!</p></div>
             <a href="{{ url_for('home') }}" class="back-link">← Back to Home</a>
         {% else %}
+            {% if rate_limited %}<div class="error-message"><p>অনেকগুলো বার্তা পাঠানো হয়েছে, একটু পরে আবার চেষ্টা করুন।</p><p>Too many messages, please try again in a minute.</p></div>{% endif %}
             <form method="post">
                 <div class="form-group"><label for="type">বিষয় (Subject):</label>
                     <select name="type" id="type">
@@ -799,12 +829,80 @@ contact_html = """
 # --- END OF contact_html TEMPLATE ---
 
 
+# === Template registry: সব টেমপ্লেট স্টার্টআপে একবারই কম্পাইল করা হয় ===
+TEMPLATES = {
+    "index.html": index_html,
+    "genres.html": genres_html,
+    "detail.html": detail_html,
+    "watch.html": watch_html,
+    "admin.html": admin_html,
+    "edit.html": edit_html,
+    "contact.html": contact_html,
+}
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", os.path.join(BASE_DIR, ".jinja_cache"))
+
+class StringTemplateLoader(BaseLoader):
+    """Serves the inline templates above by name. They cannot change while the process runs."""
+    def __init__(self, templates):
+        self.templates = templates
+
+    def get_source(self, environment, template):
+        if template not in self.templates:
+            raise TemplateNotFound(template)
+        return self.templates[template], None, lambda: True
+
+    def list_templates(self):
+        return sorted(self.templates)
+
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+app.jinja_env.loader = StringTemplateLoader(TEMPLATES)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+def precompile_templates():
+    """Loads every template into Jinja's cache and prints what each one cost."""
+    total = 0.0
+    for name, source in TEMPLATES.items():
+        started = time.perf_counter()
+        app.jinja_env.get_template(name)
+        elapsed = (time.perf_counter() - started) * 1000
+        total += elapsed
+        print(f"Template {name:13} {len(source):>7} bytes  compiled in {elapsed:6.1f} ms")
+    print(f"Templates ready in {total:.1f} ms (bytecode cache: {TEMPLATE_CACHE_DIR}).")
+
+# Shared CSS/JS live in static/ and are served under content-hash names (see assets.py).
+asset_manifest = AssetManifest(os.path.join(BASE_DIR, "static"))
+asset_manifest.build()
+app.jinja_env.globals["asset_url"] = asset_manifest.url
+
+# Posters are resized into POSTER_WIDTHS and served from our own /poster route (see posters.py).
+POSTER_SIGNING_KEY = os.getenv("SECRET_KEY") or hashlib.sha256(f"{MONGO_URI}:{ADMIN_PASSWORD}".encode()).hexdigest()
+poster_cache = PosterCache(
+    os.getenv("POSTER_CACHE_DIR", os.path.join(BASE_DIR, "poster_cache")), POSTER_SIGNING_KEY,
+    max_bytes=int(os.getenv("POSTER_CACHE_MAX_MB", 1024)) * 1024 * 1024,
+    observer=observe_poster,
+)
+
+def poster_src(url, width=342):
+    if not url: return asset_manifest.url("img/placeholder.svg")
+    return url_for('poster', width=width, token=poster_cache.token(url))
+
+def poster_srcset(url):
+    return ", ".join(f"{poster_src(url, width)} {width}w" for width in POSTER_WIDTHS)
+
+app.jinja_env.globals.update(poster_src=poster_src, poster_srcset=poster_srcset)
+
+precompile_templates()
+asset_manifest.report(TEMPLATES)
+
+
 # ----------------- Flask Routes (MODIFIED AND FINAL) -----------------
 
-def get_tmdb_details_by_title(title, content_type):
+def get_tmdb_details_by_title(title, content_type, strict=False, tmdb_id=None):
     """
     NEW HELPER FUNCTION: Fetches TMDB data by title and content type.
     This is called when adding/editing content to solve the poster delay issue.
+    A known `tmdb_id` is fetched directly; the title search could pick a different title.
+    With strict=True a TMDB error is raised instead of returning {}, so the caller can retry.
     """
     if not TMDB_API_KEY:
         return {}
@@ -812,19 +910,18 @@ def get_tmdb_details_by_title(title, content_type):
     tmdb_type = "tv" if content_type == "series" else "movie"
     details = {}
     try:
-        search_url = f"https://api.themoviedb.org/3/search/{tmdb_type}?api_key={TMDB_API_KEY}&query={requests.utils.quote(title)}"
-        search_res = requests.get(search_url, timeout=5).json()
-        
-        if not search_res.get("results"):
-            print(f"No TMDB results found for '{title}'")
-            return {}
-            
-        tmdb_id = search_res["results"][0].get("id")
         if not tmdb_id:
-            return {}
+            search_res = tmdb.get(f"/search/{tmdb_type}", query=title)
 
-        detail_url = f"https://api.themoviedb.org/3/{tmdb_type}/{tmdb_id}?api_key={TMDB_API_KEY}"
-        res = requests.get(detail_url, timeout=5).json()
+            if not search_res.get("results"):
+                print(f"No TMDB results found for '{title}'")
+                return {}
+
+            tmdb_id = search_res["results"][0].get("id")
+            if not tmdb_id:
+                return {}
+
+        res = tmdb.get(f"/{tmdb_type}/{tmdb_id}")
         
         details["tmdb_id"] = tmdb_id
         if res.get("poster_path"):
@@ -846,12 +943,13 @@ def get_tmdb_details_by_title(title, content_type):
         
     except requests.RequestException as e:
         print(f"TMDb API error while fetching '{title}': {e}")
+        if strict: raise
         return {}
 
-def fetch_and_prepare_data(form):
+def prepare_movie_data(form):
     """
-    NEW HELPER FUNCTION: Processes form data and fetches from TMDB if necessary.
-    This is the core solution for the poster loading issue.
+    Turns the admin form into a movie document. TMDB details are filled in
+    afterwards by the enrichment queue, so saving never waits on TMDB.
     """
     title = form.get("title")
     content_type = form.get("content_type", "movie")
@@ -868,17 +966,6 @@ def fetch_and_prepare_data(form):
         "genres": [g.strip() for g in form.get("genres", "").split(',') if g.strip()]
     }
 
-    if not movie_data["poster"] or not movie_data["overview"]:
-        print(f"Manual details missing for '{title}'. Fetching from TMDb...")
-        tmdb_data = get_tmdb_details_by_title(title, content_type)
-        
-        if not movie_data.get("poster"): movie_data["poster"] = tmdb_data.get("poster")
-        if not movie_data.get("overview"): movie_data["overview"] = tmdb_data.get("overview")
-        if not movie_data.get("release_date"): movie_data["release_date"] = tmdb_data.get("release_date")
-        if not movie_data.get("genres"): movie_data["genres"] = tmdb_data.get("genres")
-        if tmdb_data.get("tmdb_id"): movie_data["tmdb_id"] = tmdb_data.get("tmdb_id")
-        if tmdb_data.get("vote_average"): movie_data["vote_average"] = tmdb_data.get("vote_average")
-
     if content_type == "movie":
         movie_data["watch_link"] = form.get("watch_link", "")
         links = []
@@ -900,86 +987,431 @@ def fetch_and_prepare_data(form):
                 "episode_number": int(episode_numbers[i]), "title": form.getlist('episode_title[]')[i],
                 "watch_link": form.getlist('episode_watch_link[]')[i], "links": ep_links
             })
-        movie_data["episodes"] = episodes
+        movie_data["episodes"] = normalize_episodes(episodes)
+        movie_data["episode_count"] = len(episodes)
+        
+    return movie_data
+
+def needs_enrichment(movie_data):
+    return bool(TMDB_API_KEY) and (not movie_data.get("poster") or not movie_data.get("overview")
+                                   or (movie_data.get("tmdb_id") and "trailer_checked_at" not in movie_data))
+
+def enrich_movie_data(movie_data, strict=False):
+    """Fills missing poster/overview/genres from TMDB and stores the trailer key; used by the enrichment queue and bulk import."""
+    title, content_type = movie_data["title"], movie_data.get("type", "movie")
+    if not movie_data.get("poster") or not movie_data.get("overview"):
+        print(f"Manual details missing for '{title}'. Fetching from TMDb...")
+        tmdb_data = get_tmdb_details_by_title(title, content_type, strict=strict, tmdb_id=movie_data.get("tmdb_id"))
         
+        if not movie_data.get("poster"): movie_data["poster"] = tmdb_data.get("poster")
+        if not movie_data.get("overview"): movie_data["overview"] = tmdb_data.get("overview")
+        if not movie_data.get("release_date"): movie_data["release_date"] = tmdb_data.get("release_date")
+        if not movie_data.get("genres"): movie_data["genres"] = tmdb_data.get("genres")
+        if tmdb_data.get("tmdb_id") and not movie_data.get("tmdb_id"): movie_data["tmdb_id"] = tmdb_data.get("tmdb_id")
+        if tmdb_data.get("vote_average"): movie_data["vote_average"] = tmdb_data.get("vote_average")
+
+    # Resolve the trailer now so the detail page never has to call TMDB.
+    if movie_data.get("tmdb_id"):
+        movie_data["trailer_key"] = get_trailer_key(movie_data["tmdb_id"], "tv" if content_type == "series" else "movie")
+        movie_data["trailer_checked_at"] = datetime.utcnow()
     return movie_data
 
 def get_trailer_key(tmdb_id, tmdb_type):
     if not TMDB_API_KEY or not tmdb_id: return None
     try:
-        video_url = f"https://api.themoviedb.org/3/{tmdb_type}/{tmdb_id}/videos?api_key={TMDB_API_KEY}"
-        video_res = requests.get(video_url, timeout=5).json()
+        video_res = tmdb.get(f"/{tmdb_type}/{tmdb_id}/videos")
         for v in video_res.get("results", []):
             if v['type'] == 'Trailer' and v['site'] == 'YouTube': return v['key']
     except requests.RequestException: pass
     return None
 
+def refresh_trailers():
+    """
+    Stores trailer keys for titles that were never checked (backfill) and re-checks
+    titles that had no trailer after TRAILER_RECHECK_DAYS.
+    """
+    if not TMDB_API_KEY: return 0
+    cutoff = datetime.utcnow() - timedelta(days=TRAILER_RECHECK_DAYS)
+    query = {"tmdb_id": {"$ne": None}, "$or": [
+        {"trailer_checked_at": {"$exists": False}},
+        {"trailer_key": None, "trailer_checked_at": {"$lt": cutoff}},
+    ]}
+    updated = changed = 0
+    for movie in movies.find(query, {"tmdb_id": 1, "type": 1, "trailer_key": 1}):
+        trailer_key = get_trailer_key(movie["tmdb_id"], "tv" if movie.get("type") == "series" else "movie")
+        movies.update_one({"_id": movie["_id"]}, {"$set": {"trailer_key": trailer_key, "trailer_checked_at": datetime.utcnow()}})
+        updated += 1
+        changed += trailer_key != movie.get("trailer_key")
+    # Only a new trailer key changes what pages show; a re-check that finds nothing keeps the caches.
+    if changed: bump_catalog_version()
+    print(f"Trailer refresh checked {updated} titles ({changed} changed).")
+    return updated
+
+def claim_trailer_refresh():
+    """
+    Claims the next trailer refresh for this process. The last run time lives in
+    meta, so across workers and restarts only one run happens per TRAILER_REFRESH_HOURS.
+    """
+    now = datetime.utcnow()
+    try:
+        # When the run is not due the filter misses, and the upsert hits the existing _id.
+        meta.find_one_and_update(
+            {"_id": "trailer_refresh", "last_run": {"$lte": now - timedelta(hours=TRAILER_REFRESH_HOURS)}},
+            {"$set": {"last_run": now}}, upsert=True)
+        return True
+    except DuplicateKeyError:
+        return False
+
+def trailer_refresh_loop():
+    while True:
+        try:
+            if claim_trailer_refresh(): refresh_trailers()
+        except Exception as e:
+            print(f"Trailer refresh failed: {e}")
+        time.sleep(min(TRAILER_REFRESH_HOURS * 3600, TRAILER_CLAIM_INTERVAL))
+
+# === Enrichment Queue: TMDB থেকে তথ্য আনা ব্যাকগ্রাউন্ডে হয় ===
+# Admin saves store the title right away with enrichment_status "pending"; a worker fills in TMDB details later.
+enrichment_queue = JobQueue(
+    jobs,
+    workers=int(os.getenv("ENRICH_WORKERS", 2)),
+    max_attempts=int(os.getenv("ENRICH_MAX_ATTEMPTS", 5)),
+    base_delay=int(os.getenv("ENRICH_RETRY_DELAY", 30)),
+)
+
+def queue_enrichment(movie_id):
+    enrichment_queue.enqueue("enrich", {"movie_id": str(movie_id)}, key=f"enrich:{movie_id}")
+
+def run_enrichment(payload):
+    movie_id = ObjectId(payload["movie_id"])
+    movie = movies.find_one({"_id": movie_id})
+    if not movie: return
+    before = dict(movie)
+    enrich_movie_data(movie, strict=True)
+    # Only the fields enrichment filled are written, so an admin edit made meanwhile is not overwritten.
+    changes = {key: value for key, value in movie.items() if before.get(key) != value}
+    changes.update(enrichment_status="done", enriched_at=datetime.utcnow())
+    movies.update_one({"_id": movie_id}, {"$set": changes, "$unset": {"enrichment_error": ""}})
+    catalog_changed(movie_id, movie)
+
+def enrichment_failed(payload, error, final):
+    movies.update_one({"_id": ObjectId(payload["movie_id"])},
+                      {"$set": {"enrichment_status": "failed" if final else "retrying", "enrichment_error": str(error)[:200]}})
+
+enrichment_queue.register("enrich", run_enrichment, on_error=enrichment_failed)
+
+# Background jobs are started by the first request of each process, so they also run in forked workers.
+_background_jobs = {"pid": None}
+_background_lock = threading.Lock()
+
+@app.before_request
+def start_background_jobs():
+    if _background_jobs["pid"] == os.getpid(): return
+    with _background_lock:
+        if _background_jobs["pid"] == os.getpid(): return
+        _background_jobs["pid"] = os.getpid()
+        settings_cache.get()
+        metrics.start_snapshots()
+        # Every process polls; claim_trailer_refresh lets one of them run each refresh.
+        if TRAILER_REFRESH_HOURS > 0:
+            threading.Thread(target=trailer_refresh_loop, name="trailer-refresh", daemon=True).start()
+        enrichment_queue.start()
+        import_queue.start()
+
 def process_movie_list(movie_list):
     for item in movie_list:
         if '_id' in item: item['_id'] = str(item['_id'])
     return movie_list
 
-@app.route('/')
-def home():
-    query = request.args.get('q')
-    if query:
-        movies_list = list(movies.find({"title": {"$regex": query, "$options": "i"}}).sort('_id', -1))
-        return render_template_string(index_html, movies=process_movie_list(movies_list), query=f'Results for "{query}"', is_full_page_list=True)
-    
+def build_home_feed():
     all_badges = movies.distinct("poster_badge")
     all_badges = sorted([badge for badge in all_badges if badge])
 
     limit = 12 # MODIFIED: Set limit to 12
-    context = {
-        "trending_movies": process_movie_list(list(movies.find({"is_trending": True, "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "latest_movies": process_movie_list(list(movies.find({"type": "movie", "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "latest_series": process_movie_list(list(movies.find({"type": "series", "is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
-        "coming_soon_movies": process_movie_list(list(movies.find({"is_coming_soon": True}).sort('_id', -1).limit(limit))),
-        "recently_added": process_movie_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(6))), # For hero slider
-        "recently_added_full": process_movie_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1).limit(limit))),
+    return {
+        "trending_movies": process_movie_list(list(movies.find(LIST_QUERIES["trending_movies"], CARD_FIELDS).sort('_id', -1).limit(limit))),
+        "latest_movies": process_movie_list(list(movies.find(LIST_QUERIES["movies_only"], CARD_FIELDS).sort('_id', -1).limit(limit))),
+        "latest_series": process_movie_list(list(movies.find(LIST_QUERIES["webseries"], CARD_FIELDS).sort('_id', -1).limit(limit))),
+        "coming_soon_movies": process_movie_list(list(movies.find(LIST_QUERIES["coming_soon"], CARD_FIELDS).sort('_id', -1).limit(limit))),
+        "recently_added": process_movie_list(list(movies.find(LIST_QUERIES["recently_added_all"], HERO_FIELDS).sort('_id', -1).limit(6))), # For hero slider
+        "recently_added_full": process_movie_list(list(movies.find(LIST_QUERIES["recently_added_all"], CARD_FIELDS).sort('_id', -1).limit(limit))),
         "is_full_page_list": False, "query": "", "all_badges": all_badges
     }
-    return render_template_string(index_html, **context)
+
+home_feed_cache = CachedValue(build_home_feed, ttl=HOME_FEED_TTL)
+
+def build_search_index():
+    started = time.monotonic()
+    index = build_title_index((str(m['_id']), m.get('title', '')) for m in movies.find({}, {"title": 1}))
+    print(f"Search index built with {len(index)} titles in {time.monotonic() - started:.2f}s.")
+    return index
+
+# Writes in this process update the index in place. A version bump from another process starts a
+# background rebuild (see load_catalog_version); SEARCH_INDEX_REFRESH is the fallback.
+search_index_cache = CachedValue(build_search_index, ttl=SEARCH_INDEX_REFRESH)
+
+def build_suggest_index():
+    return build_prefix_index((str(m['_id']), m.get('title', ''), m.get('poster')) for m in movies.find({}, {"title": 1, "poster": 1}))
+
+suggest_index_cache = CachedValue(build_suggest_index, ttl=SEARCH_INDEX_REFRESH)
+
+related_titles = RelatedTitles(movies, k=12)
+
+# === Catalog version: প্রতিটি অ্যাডমিন পরিবর্তনে বাড়ে, ETag/Last-Modified এর ভিত্তি ===
+def _catalog_state(doc):
+    return doc["version"], doc["updated_at"].replace(tzinfo=timezone.utc)
+
+def load_catalog_version():
+    # A plain read; the upsert (a write on the primary) only happens on the very first load.
+    doc = meta.find_one({"_id": "catalog"}) or meta.find_one_and_update(
+        {"_id": "catalog"}, {"$setOnInsert": {"version": 0, "updated_at": datetime.utcnow()}},
+        upsert=True, return_document=ReturnDocument.AFTER)
+    state = _catalog_state(doc)
+    # A newer version written by another process makes our own caches stale as well. The indexes
+    # are rebuilt in the background, after SEARCH_INDEX_SYNC_DELAY folds a burst of writes together.
+    if _seen_catalog_version["version"] not in (None, state[0]):
+        home_feed_cache.invalidate()
+        settings_cache.invalidate()
+        search_index_cache.refresh_in_background(SEARCH_INDEX_SYNC_DELAY)
+        suggest_index_cache.refresh_in_background(SEARCH_INDEX_SYNC_DELAY)
+    _seen_catalog_version["version"] = state[0]
+    return state
+
+_seen_catalog_version = {"version": None}
+catalog_version_cache = CachedValue(load_catalog_version, ttl=CATALOG_VERSION_TTL)
+
+def bump_catalog_version():
+    doc = meta.find_one_and_update(
+        {"_id": "catalog"}, {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True, return_document=ReturnDocument.AFTER)
+    state = _catalog_state(doc)
+    _seen_catalog_version["version"] = state[0]
+    catalog_version_cache.set(state)
+
+# === Compression: gzip/brotli, আর ক্যাটালগ ভার্সন অনুযায়ী কম্প্রেস করা পেজের ক্যাশ ===
+COMPRESSIBLE_TYPES = {"text/html", "text/css", "text/plain", "application/javascript", "application/json", "image/svg+xml"}
+
+def negotiate_encoding():
+    if brotli and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+class PageCache:
+    """LRU of compressed page bodies keyed by (catalog version, path with query, encoding)."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype):
+        with self._lock:
+            self._entries[key] = (body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "max_entries": self.max_entries}
+
+page_cache = PageCache(PAGE_CACHE_ENTRIES)
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    data = response.get_data()
+    if not encoding or len(data) < COMPRESS_MIN_SIZE:
+        return response
+    body = compress(data, encoding)
+    if g.get("page_cache_key"):
+        page_cache.put(g.page_cache_key + (encoding,), body, response.mimetype)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def conditional_get(view):
+    """
+    Adds ETag/Last-Modified from the catalog version to a public page and answers
+    If-None-Match / If-Modified-Since with 304 before the view touches Mongo.
+    Compressed bodies of these pages are cached until the catalog version changes.
+    """
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        version, updated_at = catalog_version_cache.get()
+        etag = f"catalog-{version}"
+        # Last-Modified has whole seconds, so a later bump in the same second would share it. It is only
+        # used once that second is over and every process has had CATALOG_VERSION_TTL to see such a bump.
+        last_modified = updated_at.replace(microsecond=0)
+        settled = datetime.now(timezone.utc) >= last_modified + timedelta(seconds=1 + CATALOG_VERSION_TTL)
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = bool(settled and request.if_modified_since and last_modified <= request.if_modified_since)
+        if not_modified:
+            response = Response(status=304)
+        else:
+            # While the indexes catch up with another process's write, pages are not cached under the new version.
+            if not (search_index_cache.refreshing or suggest_index_cache.refreshing):
+                g.page_cache_key = (version, request.full_path)
+            encoding = negotiate_encoding()
+            cached = page_cache.get((version, request.full_path, encoding)) if encoding else None
+            if cached:
+                response = Response(cached[0], mimetype=cached[1], headers={"Content-Encoding": encoding})
+                response.vary.add("Accept-Encoding")
+            else:
+                response = make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.set_etag(etag, weak=True)
+            if settled: response.last_modified = last_modified
+            response.cache_control.no_cache = True
+        return response
+    return decorated
+
+def catalog_changed(movie_id=None, movie=None, titles_changed=True):
+    """
+    Called after every write to `movies` so cached views are rebuilt.
+    Pass the id and new document of an added/edited title, only the id of a deleted one,
+    or nothing after a bulk change (titles_changed=False when no title was added, renamed or removed).
+    """
+    home_feed_cache.invalidate()
+    if movie_id is None:
+        if titles_changed:
+            search_index_cache.invalidate()
+            suggest_index_cache.invalidate()
+    elif movie is None:
+        search_index_cache.get().remove(str(movie_id))
+        suggest_index_cache.get().remove(str(movie_id))
+        related_titles.on_delete(ObjectId(movie_id))
+    else:
+        search_index_cache.get().add(str(movie_id), movie.get('title', ''))
+        suggest_index_cache.get().add(str(movie_id), movie.get('title', ''), movie.get('poster'))
+        related_titles.on_upsert(ObjectId(movie_id))
+    # Bumped last: a request that sees the new version (and may cache its page) also sees the updated views.
+    bump_catalog_version()
+
+@app.route('/')
+@conditional_get
+def home():
+    query = request.args.get('q')
+    if query:
+        return render_search_results(query)
+    
+    return render_template("index.html", **home_feed_cache.get())
+
+@app.route('/api/suggest')
+@conditional_get
+def suggest():
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', SUGGEST_LIMIT, type=int), 1), 20)
+    results = [{"id": doc_id, "title": title, "poster": poster_src(poster, 185), "url": url_for('movie_detail', movie_id=doc_id)}
+               for doc_id, title, poster in suggest_index_cache.get().suggest(query, limit)]
+    return jsonify({"query": query, "results": results})
 
 @app.route('/movie/<movie_id>')
+@conditional_get
 def movie_detail(movie_id):
     try:
-        movie = movies.find_one({"_id": ObjectId(movie_id)})
+        # Series only load the requested range of episodes (?eps=<page>).
+        episode_page = max(request.args.get('eps', 1, type=int), 1)
+        start = (episode_page - 1) * EPISODE_PAGE_SIZE
+        movie = movies.find_one({"_id": ObjectId(movie_id)}, {"episodes": {"$slice": [start, EPISODE_PAGE_SIZE]}})
         if not movie: return "Content not found", 404
-        
+        ranges = []
+        if movie.get('type') == 'series' and "episode_count" not in movie:
+            # Saved before episode_count existed: sort in memory here; `normalize-episodes` fixes the stored order.
+            episodes = normalize_episodes(movies.find_one({"_id": movie["_id"]}, {"episodes": 1}).get("episodes") or [])
+            movie["episodes"], movie["episode_count"] = episodes[start:start + EPISODE_PAGE_SIZE], len(episodes)
+            ranges = episode_ranges(episodes, EPISODE_PAGE_SIZE)
+        elif movie.get('type') == 'series' and (movie.get("episode_count") or 0) > EPISODE_PAGE_SIZE:
+            # Only the numbers of every episode, for the range labels.
+            numbers = movies.find_one({"_id": movie["_id"]}, {"episodes.episode_number": 1})
+            ranges = episode_ranges(numbers.get("episodes") or [], EPISODE_PAGE_SIZE)
         movie['_id'] = str(movie['_id'])
-        
-        related_movies = []
-        if movie.get("genres"):
-            related_movies = list(movies.find({"genres": {"$in": movie["genres"]}, "_id": {"$ne": ObjectId(movie_id)}}).sort('_id',-1).limit(12))
+
+        # Neighbors are precomputed by RelatedTitles; titles without any fall back to the cached "Recently Added" row.
+        related_movies = movie.pop("related", None)
         if not related_movies:
-            related_movies = list(movies.find({"_id": {"$ne": ObjectId(movie_id)}, "is_coming_soon": {"$ne": True}}).sort("_id", -1).limit(12))
+            related_movies = [m for m in home_feed_cache.get()["recently_added_full"] if m['_id'] != movie['_id']]
 
-        trailer_key = get_trailer_key(movie.get("tmdb_id"), "tv" if movie.get("type") == "series" else "movie")
-        
-        return render_template_string(detail_html, movie=movie, trailer_key=trailer_key, related_movies=process_movie_list(related_movies))
+        return render_template("detail.html", movie=movie, trailer_key=movie.get("trailer_key"), related_movies=process_movie_list(related_movies),
+                               episode_ranges=ranges if len(ranges) > 1 else [], episode_page=episode_page)
     except Exception as e:
         print(f"Error in movie_detail: {e}")
-        return render_template_string(detail_html, movie=None, trailer_key=None, related_movies=[])
+        return render_template("detail.html", movie=None, trailer_key=None, related_movies=[])
+
+def normalize_stored_episodes(movie_id):
+    """Sorts the stored episodes of a series saved before episode_count existed (`bot.py normalize-episodes`)."""
+    doc = movies.find_one({"_id": movie_id}, {"episodes": 1})
+    episodes = normalize_episodes(doc.get("episodes") or [])
+    movies.update_one({"_id": movie_id}, {"$set": {"episodes": episodes, "episode_count": len(episodes)}})
+    return episodes
 
 @app.route('/watch/<movie_id>')
+@conditional_get
 def watch_movie(movie_id):
     try:
-        movie = movies.find_one({"_id": ObjectId(movie_id)})
+        episode_num = request.args.get('ep')
+        projection = {"title": 1, "type": 1, "watch_link": 1}
+        if episode_num:
+            # Only the matching episode comes back from Mongo, whatever its position in the series.
+            numbers = [episode_num] + ([int(episode_num)] if episode_num.isdigit() else [])
+            projection["episodes"] = {"$elemMatch": {"episode_number": {"$in": numbers}}}
+        movie = movies.find_one({"_id": ObjectId(movie_id)}, projection)
         if not movie: return "Content not found.", 404
         watch_link, title = movie.get("watch_link"), movie.get("title")
-        episode_num = request.args.get('ep')
         if episode_num and movie.get('type') == 'series' and movie.get('episodes'):
-            for ep in movie['episodes']:
-                if str(ep.get('episode_number')) == episode_num:
-                    watch_link, title = ep.get('watch_link'), f"{title} - E{episode_num}: {ep.get('title')}"
-                    break
-        if watch_link: return render_template_string(watch_html, watch_link=watch_link, title=title)
+            ep = movie['episodes'][0]
+            watch_link, title = ep.get('watch_link'), f"{title} - E{episode_num}: {ep.get('title')}"
+        if watch_link: return render_template("watch.html", watch_link=watch_link, title=title)
         return "Watch link not found for this content.", 404
     except Exception as e:
         print(f"Watch page error: {e}")
         return "An error occurred.", 500
 
+# === Feedback Intake: স্প্যাম আটকাতে রেট লিমিট, ডুপ্লিকেট বাদ, ব্যাচে লেখা ===
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+FEEDBACK_PER_MINUTE = float(os.getenv("FEEDBACK_PER_MINUTE", 5))
+FEEDBACK_DUPLICATE_WINDOW = int(os.getenv("FEEDBACK_DUPLICATE_WINDOW", 600))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", 1))  # set by serve.py in each worker
+
+feedback_writer = BufferedWriter(
+    feedback,
+    max_batch=int(os.getenv("FEEDBACK_BATCH_SIZE", 100)),
+    flush_interval=float(os.getenv("FEEDBACK_FLUSH_SECONDS", 2)),
+)
+# Each worker has its own buckets, so it allows its share of FEEDBACK_PER_MINUTE; rejected posts never reach Mongo.
+worker_feedback_rate = FEEDBACK_PER_MINUTE / max(1, SERVE_WORKERS)
+feedback_limiter = KeyedRateLimiter(worker_feedback_rate / 60, burst=max(1, worker_feedback_rate))
+feedback_drops = {"rate_limited": 0}
+
+def client_ip():
+    # X-Forwarded-For is only honoured behind a proxy we control; otherwise clients could pick their own bucket.
+    if TRUST_PROXY_HEADERS and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
     if request.method == 'POST':
@@ -988,107 +1420,477 @@ def contact():
             "message": request.form.get("message"), "email": request.form.get("email", "").strip(),
             "reported_content_id": request.form.get("reported_content_id"), "timestamp": datetime.utcnow()
         }
-        feedback.insert_one(feedback_data)
-        return render_template_string(contact_html, message_sent=True)
+        if not feedback_limiter.allow(client_ip()):
+            feedback_drops["rate_limited"] += 1
+            return render_template("contact.html", message_sent=False, rate_limited=True, prefill_title=feedback_data["content_title"] or '',
+                                   prefill_id=feedback_data["reported_content_id"] or '', prefill_type=feedback_data["type"]), 429
+        # A repeated message is answered as sent, so spammers learn nothing; the writer drops it on insert.
+        feedback_data["dedup_key"] = duplicate_key(FEEDBACK_DUPLICATE_WINDOW, feedback_data["type"], feedback_data["content_title"],
+                                                   feedback_data["message"], feedback_data["reported_content_id"])
+        feedback_writer.add(feedback_data)
+        return render_template("contact.html", message_sent=True)
     prefill_title, prefill_id = request.args.get('title', ''), request.args.get('report_id', '')
     prefill_type = 'Problem Report' if prefill_id else 'Movie Request'
-    return render_template_string(contact_html, message_sent=False, prefill_title=prefill_title, prefill_id=prefill_id, prefill_type=prefill_type)
+    return render_template("contact.html", message_sent=False, prefill_title=prefill_title, prefill_id=prefill_id, prefill_type=prefill_type)
 
 @app.route('/admin', methods=["GET", "POST"])
 @requires_auth
 def admin():
     if request.method == "POST":
         if 'title' in request.form:
-            movie_data = fetch_and_prepare_data(request.form)
-            movies.insert_one(movie_data)
-            print(f"SUCCESS: Added new content '{movie_data['title']}' with auto-fetched details.")
+            movie_data = prepare_movie_data(request.form)
+            enrich = needs_enrichment(movie_data)
+            movie_data["enrichment_status"] = "pending" if enrich else "done"
+            result = movies.insert_one(movie_data)
+            catalog_changed(result.inserted_id, movie_data)
+            if enrich: queue_enrichment(result.inserted_id)
+            print(f"SUCCESS: Added new content '{movie_data['title']}'.")
         return redirect(url_for('admin'))
     
-    all_content = process_movie_list(list(movies.find().sort('_id', -1)))
-    feedback_list = process_movie_list(list(feedback.find().sort('timestamp', -1)))
-    ad_settings = settings.find_one() or {}
-    return render_template_string(admin_html, all_content=all_content, feedback_list=feedback_list, ad_settings=ad_settings)
+    # Only counts and the first page of each table; admin.js fetches the rest from the JSON endpoints below.
+    admin_data = {
+        "counts": admin_counts(),
+        "content": admin_content_page({}),
+        "feedback": admin_feedback_page(1),
+        "urls": {
+            "content": url_for('admin_content_api'), "feedback": url_for('admin_feedback_api'),
+            "edit": url_for('edit_movie', movie_id='ID'), "delete": url_for('delete_movie', movie_id='ID'),
+            "delete_feedback": url_for('delete_feedback', feedback_id='ID'), "bulk": url_for('bulk_action'),
+        },
+    }
+    return render_template("admin.html", admin_data=admin_data)
+
+# === Admin API: কনটেন্ট ও ফিডব্যাক টেবিল পেজ করে JSON হিসেবে ===
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", 50))
+ADMIN_FIELDS = {"title": 1, "type": 1, "poster_badge": 1, "is_trending": 1, "is_coming_soon": 1,
+                "enrichment_status": 1, "enrichment_error": 1}
+ADMIN_SORTS = {
+    "newest": [("_id", -1)],
+    "oldest": [("_id", 1)],
+    "title": [("title", 1), ("_id", -1)],
+    "title_desc": [("title", -1), ("_id", -1)],
+}
+
+def admin_counts():
+    return {
+        "titles": movies.estimated_document_count(),
+        "movies": movies.count_documents({"type": "movie"}),
+        "series": movies.count_documents({"type": "series"}),
+        "trending": movies.count_documents({"is_trending": True}),
+        "coming_soon": movies.count_documents({"is_coming_soon": True}),
+        "enrichment_pending": movies.count_documents({"enrichment_status": {"$in": ["pending", "retrying"]}}),
+        "enrichment_failed": movies.count_documents({"enrichment_status": "failed"}),
+        "feedback": feedback.estimated_document_count(),
+        "badges": sorted(b for b in movies.distinct("poster_badge") if b),
+    }
+
+def admin_content_query(args):
+    """Builds the Mongo filter for the admin content table from query-string style `args`."""
+    query = {}
+    if args.get("type") in ("movie", "series"):
+        query["type"] = args["type"]
+    badge = args.get("badge")
+    if badge == "none":
+        query["poster_badge"] = {"$in": ["", None]}
+    elif badge:
+        query["poster_badge"] = badge
+    for arg, field in (("trending", "is_trending"), ("coming_soon", "is_coming_soon")):
+        if args.get(arg) == "true":
+            query[field] = True
+        elif args.get(arg) == "false":
+            query[field] = {"$ne": True}
+    status = args.get("status")
+    if status == "done":
+        query["enrichment_status"] = {"$in": ["done", None]}
+    elif status in ("pending", "retrying", "failed"):
+        query["enrichment_status"] = status
+    return query
+
+def _admin_row(movie):
+    row = {key: movie.get(key) for key in ADMIN_FIELDS}
+    row["_id"] = str(movie["_id"])
+    row["enrichment_status"] = movie.get("enrichment_status") or "done"
+    return row
+
+def admin_content_page(args):
+    page = max(int(args.get("page") or 1), 1)
+    per_page = min(max(int(args.get("per_page") or ADMIN_PAGE_SIZE), 1), 200)
+    query = admin_content_query(args)
+    q = (args.get("q") or "").strip()
+    sort = args.get("sort") if args.get("sort") in ADMIN_SORTS else None
+    if q:
+        # Title search goes through the trigram index; matches keep their relevance order unless a sort is chosen.
+        ranked = [ObjectId(i) for i in search_index_cache.get().search(q, limit=SEARCH_RESULT_LIMIT)]
+        query["_id"] = {"$in": ranked}
+        if sort is None:
+            found = {m["_id"]: m for m in movies.find(query, ADMIN_FIELDS)}
+            matched = [found[i] for i in ranked if i in found]
+            total, items = len(matched), matched[(page - 1) * per_page:page * per_page]
+            return {"items": [_admin_row(m) for m in items], "total": total, "page": page, "per_page": per_page, "sort": "relevance"}
+    sort = sort or "newest"
+    total = movies.count_documents(query)
+    cursor = movies.find(query, ADMIN_FIELDS).sort(ADMIN_SORTS[sort]).skip((page - 1) * per_page).limit(per_page)
+    return {"items": [_admin_row(m) for m in cursor], "total": total, "page": page, "per_page": per_page, "sort": sort}
+
+def admin_feedback_page(page, per_page=ADMIN_PAGE_SIZE):
+    page = max(page, 1)
+    items = []
+    for item in feedback.find().sort('timestamp', -1).skip((page - 1) * per_page).limit(per_page):
+        items.append({
+            "_id": str(item["_id"]), "type": item.get("type"), "content_title": item.get("content_title"),
+            "message": item.get("message"), "email": item.get("email"),
+            "timestamp": item["timestamp"].strftime('%Y-%m-%d %H:%M') if item.get("timestamp") else "",
+        })
+    return {"items": items, "total": feedback.estimated_document_count(), "page": page, "per_page": per_page}
+
+@app.route('/admin/api/content')
+@requires_auth
+def admin_content_api():
+    try:
+        return jsonify(admin_content_page(request.args))
+    except ValueError:
+        return jsonify({"error": "page and per_page must be numbers"}), 400
+
+@app.route('/admin/api/feedback')
+@requires_auth
+def admin_feedback_api():
+    return jsonify(admin_feedback_page(request.args.get('page', 1, type=int)))
 
 @app.route('/admin/save_ads', methods=['POST'])
 @requires_auth
 def save_ads():
     ad_codes = { "popunder_code": request.form.get("popunder_code", ""), "social_bar_code": request.form.get("social_bar_code", ""), "banner_ad_code": request.form.get("banner_ad_code", ""), "native_banner_code": request.form.get("native_banner_code", "") }
     settings.update_one({}, {"$set": ad_codes}, upsert=True)
+    settings_cache.invalidate()
+    bump_catalog_version()
     return redirect(url_for('admin'))
 
 @app.route('/edit_movie/<movie_id>', methods=["GET", "POST"])
 @requires_auth
 def edit_movie(movie_id):
-    try:
-        movie_obj = movies.find_one({"_id": ObjectId(movie_id)})
-    except:
-        return "Invalid Movie ID", 400
-    if not movie_obj: return "Movie not found", 404
+    if not ObjectId.is_valid(movie_id): return "Invalid Movie ID", 400
     
     if request.method == "POST":
-        update_data = fetch_and_prepare_data(request.form)
+        update_data = prepare_movie_data(request.form)
+        # The form never carries tmdb_id, so the poster/overview check alone decides on enrichment.
+        enrich = needs_enrichment(update_data)
+        update_data["enrichment_status"] = "pending" if enrich else "done"
         
-        if update_data['type'] == 'movie':
-            movies.update_one({"_id": ObjectId(movie_id)}, {"$unset": {"episodes": ""}})
-        else:
-            movies.update_one({"_id": ObjectId(movie_id)}, {"$unset": {"links": "", "watch_link": ""}})
-            
-        movies.update_one({"_id": ObjectId(movie_id)}, {"$set": update_data})
-        print(f"SUCCESS: Updated content '{update_data['title']}' with auto-fetched details.")
+        current = movies.find_one({"_id": ObjectId(movie_id)}, {"title": 1, "type": 1})
+        if not current: return "Movie not found", 404
+        # One atomic write: fields of the other content type are dropped in the same update.
+        unset = {"episodes": "", "episode_count": ""} if update_data['type'] == 'movie' else {"links": "", "watch_link": ""}
+        # Details filled in by hand settle a failed enrichment as well.
+        if not enrich: unset["enrichment_error"] = ""
+        if (current.get("title"), current.get("type")) != (update_data["title"], update_data["type"]):
+            # A renamed title is a different TMDB entry; enrichment searches again instead of reusing the old id.
+            unset.update({"tmdb_id": "", "trailer_key": "", "trailer_checked_at": ""})
+        result = movies.update_one({"_id": ObjectId(movie_id)}, {"$set": update_data, "$unset": unset})
+        if not result.matched_count: return "Movie not found", 404
+        catalog_changed(movie_id, update_data)
+        if enrich: queue_enrichment(movie_id)
+        print(f"SUCCESS: Updated content '{update_data['title']}'.")
         return redirect(url_for('admin'))
     
+    movie_obj = movies.find_one({"_id": ObjectId(movie_id)})
+    if not movie_obj: return "Movie not found", 404
     movie_obj['_id'] = str(movie_obj['_id'])
-    return render_template_string(edit_html, movie=movie_obj)
+    return render_template("edit.html", movie=movie_obj)
 
 @app.route('/delete_movie/<movie_id>')
 @requires_auth
 def delete_movie(movie_id):
     movies.delete_one({"_id": ObjectId(movie_id)})
+    catalog_changed(movie_id)
     return redirect(url_for('admin'))
 
+# === Bulk Actions: একসাথে অনেক কনটেন্ট মুছে ফেলা বা আপডেট করা ===
+BULK_MAX_IDS = 1000
+
+def bulk_update_ops(ids, actions):
+    """
+    Turns bulk actions into write ops for one bulk_write. `actions` is a list of
+    {"op": "delete" | "trending" | "coming_soon" | "badge", "value": ...}; raises ValueError for bad input.
+    """
+    if any(action.get("op") == "delete" for action in actions):
+        if len(actions) > 1: raise ValueError("delete cannot be combined with other actions")
+        return [DeleteMany({"_id": {"$in": ids}}), RelatedTitles.delete_op(ids)]
+    set_fields, unset_fields = {}, {}
+    for action in actions:
+        op, value = action.get("op"), action.get("value")
+        if op in ("trending", "coming_soon"):
+            if not isinstance(value, bool): raise ValueError(f"{op} needs a true/false value")
+            set_fields["is_trending" if op == "trending" else "is_coming_soon"] = value
+        elif op == "badge":
+            set_fields["poster_badge"] = str(value or "").strip()
+        else:
+            raise ValueError(f"unknown action {op!r}")
+    if not set_fields: raise ValueError("no actions given")
+    ops = [UpdateMany({"_id": {"$in": ids}}, {"$set": set_fields})]
+    if "poster_badge" in set_fields:
+        # Related-title cards embed the badge, so they are updated in the same round trip.
+        ops.append(RelatedTitles.card_update_op(ids, {"poster_badge": set_fields["poster_badge"]}))
+    return ops
+
+@app.route('/admin/bulk', methods=['POST'])
+@requires_auth
+def bulk_action():
+    payload = request.get_json(silent=True) or {}
+    raw_ids = payload.get("ids") or []
+    if not raw_ids or len(raw_ids) > BULK_MAX_IDS or not all(ObjectId.is_valid(i) for i in raw_ids):
+        return jsonify({"error": f"Send 1-{BULK_MAX_IDS} valid ids."}), 400
+    ids = [ObjectId(i) for i in raw_ids]
+    try:
+        ops = bulk_update_ops(ids, payload.get("actions") or [])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = movies.bulk_write(ops, ordered=False)
+    if isinstance(ops[0], DeleteMany):
+        for movie_id in raw_ids:
+            search_index_cache.get().remove(movie_id)
+            suggest_index_cache.get().remove(movie_id)
+    catalog_changed(titles_changed=False)
+    print(f"Bulk action on {len(ids)} titles: {result.deleted_count} deleted, {result.modified_count} documents updated.")
+    return jsonify({"matched": len(ids), "deleted": result.deleted_count, "documents_modified": result.modified_count})
+
+@app.route('/admin/stats')
+@requires_auth
+def admin_stats():
+    return jsonify({
+        "home_feed_cache": home_feed_cache.stats(),
+        "search_index": dict(search_index_cache.stats(), titles=len(search_index_cache.get())),
+        "suggest_index": dict(suggest_index_cache.stats(), titles=len(suggest_index_cache.get())),
+        "settings_cache": settings_cache.stats(),
+        "page_cache": dict(page_cache.stats(), brotli=brotli is not None),
+        "catalog_version": dict(catalog_version_cache.stats(), current=catalog_version_cache.get()[0]),
+        "tmdb": tmdb.stats(),
+        "posters": poster_cache.stats(),
+        "enrichment_queue": enrichment_queue.stats(),
+        "import_queue": import_queue.stats(),
+        "feedback_writer": dict(feedback_writer.stats(), **{f"dropped_{reason}": count for reason, count in feedback_drops.items()}),
+        "tracing": dict(tracer.counters),
+    })
+
+# === Bulk Import: CSV / JSON lines থেকে একসাথে অনেক কনটেন্ট যোগ করা ===
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", 8))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+
+def enrich_imported(movie):
+    enrich_movie_data(movie)
+    movie["enrichment_status"] = "done"
+
+def import_catalog(rows, import_id=None):
+    """Imports `rows` into `movies` and refreshes every derived view once at the end."""
+    def save_progress(progress):
+        meta.update_one({"_id": f"import:{import_id}"}, {"$set": progress}, upsert=True)
+        import_queue.extend_lease(f"import:{import_id}")
+
+    importer = BulkImporter(movies, enrich_imported, workers=IMPORT_WORKERS, batch_size=IMPORT_BATCH_SIZE,
+                            on_progress=save_progress if import_id else None)
+    progress = importer.run(rows)
+    if progress["inserted"]:
+        related_titles.on_insert(importer.inserted_ids)
+        catalog_changed()
+    return progress
+
+# Uploads run as jobs, so an import cut off by a worker restart is picked up again once its lease
+# runs out; rows that already made it in are skipped as duplicates on the next attempt.
+import_queue = JobQueue(
+    jobs,
+    workers=1,
+    max_attempts=int(os.getenv("IMPORT_MAX_ATTEMPTS", 3)),
+    base_delay=int(os.getenv("IMPORT_RETRY_DELAY", 30)),
+    lease_seconds=int(os.getenv("IMPORT_LEASE_SECONDS", 300)),
+)
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", 15 * 1024 * 1024))  # the upload is kept in one Mongo document
+
+def run_import(payload):
+    import_id = payload["import_id"]
+    upload = import_uploads.find_one({"_id": import_id})
+    if not upload: raise LookupError(f"upload for import {import_id} is gone")
+    import_catalog(read_rows(open_text(upload["data"]), name=upload["filename"]), import_id)
+    meta.update_one({"_id": f"import:{import_id}"}, {"$unset": {"error": "", "retrying": ""}})
+    import_uploads.delete_one({"_id": import_id})
+
+def import_failed(payload, error, final):
+    import_id = payload["import_id"]
+    print(f"Import {import_id} failed: {error}")
+    state = {"done": True, "retrying": False} if final else {"done": False, "retrying": True}
+    meta.update_one({"_id": f"import:{import_id}"}, {"$set": dict(state, error=str(error)[:200])}, upsert=True)
+    if final: import_uploads.delete_one({"_id": import_id})
+
+import_queue.register("import", run_import, on_error=import_failed)
+
+@app.route('/admin/import', methods=['POST'])
+@requires_auth
+def start_import():
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return jsonify({"error": "Upload a .csv or .jsonl file as `file`."}), 400
+    data = upload.read()
+    if len(data) > IMPORT_MAX_BYTES:
+        return jsonify({"error": f"Imports are limited to {IMPORT_MAX_BYTES // (1024 * 1024)} MB; split the file."}), 413
+    import_id = str(ObjectId())
+    now = datetime.utcnow()
+    import_uploads.insert_one({"_id": import_id, "filename": upload.filename, "data": data, "created_at": now})
+    meta.insert_one({"_id": f"import:{import_id}", "filename": upload.filename, "rows": 0, "done": False, "started_at": now})
+    import_queue.enqueue("import", {"import_id": import_id}, key=f"import:{import_id}")
+    return jsonify({"id": import_id, "status_url": url_for('import_status', import_id=import_id)}), 202
+
+@app.route('/admin/import/<import_id>')
+@requires_auth
+def import_status(import_id):
+    # Progress lives in Mongo so any worker can answer the poll.
+    progress = meta.find_one({"_id": f"import:{import_id}"})
+    if not progress: return jsonify({"error": "Unknown import"}), 404
+    progress["id"] = progress.pop("_id").split(":", 1)[1]
+    return jsonify(progress)
+
 @app.route('/feedback/delete/<feedback_id>')
 @requires_auth
 def delete_feedback(feedback_id):
     feedback.delete_one({"_id": ObjectId(feedback_id)})
     return redirect(url_for('admin'))
 
-def render_full_list(content_list, title):
-    return render_template_string(index_html, movies=process_movie_list(content_list), query=title, is_full_page_list=True)
+def fetch_page(query):
+    """
+    Keyset pagination on `_id`: returns one page of `query` (newest first) starting
+    below the `?before=<id>` cursor, plus the URL of the next page if there is one.
+    """
+    before = request.args.get('before')
+    if before and ObjectId.is_valid(before):
+        query = dict(query, _id={"$lt": ObjectId(before)})
+    content_list = list(movies.find(query, CARD_FIELDS).sort('_id', -1).limit(PAGE_SIZE + 1))
+    next_url = None
+    if len(content_list) > PAGE_SIZE:
+        content_list = content_list[:PAGE_SIZE]
+        args = request.args.to_dict()
+        args.pop('partial', None)
+        args['before'] = str(content_list[-1]['_id'])
+        # view_args win over a query parameter of the same name, e.g. ?genre_name= on /genre/<genre_name>.
+        next_url = url_for(request.endpoint, **dict(args, **request.view_args))
+    return content_list, next_url
+
+def render_search_results(query):
+    page = max(request.args.get('page', 1, type=int), 1)
+    ranked_ids = search_index_cache.get().search(query, limit=SEARCH_RESULT_LIMIT)
+    page_ids = ranked_ids[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    found = {str(m['_id']): m for m in movies.find({"_id": {"$in": [ObjectId(i) for i in page_ids]}}, CARD_FIELDS)}
+    content_list = [found[i] for i in page_ids if i in found]
+    next_url = url_for('home', q=query, page=page + 1) if len(ranked_ids) > page * PAGE_SIZE else None
+    return render_template("index.html", movies=process_movie_list(content_list), query=f'Results for "{query}"', is_full_page_list=True,
+                                  next_url=next_url, is_partial=bool(request.args.get('partial')))
+
+def render_full_list(query, title):
+    content_list, next_url = fetch_page(query)
+    return render_template("index.html", movies=process_movie_list(content_list), query=title, is_full_page_list=True,
+                                  next_url=next_url, is_partial=bool(request.args.get('partial')))
 
 @app.route('/badge/<badge_name>')
+@conditional_get
 def movies_by_badge(badge_name):
-    return render_full_list(list(movies.find({"poster_badge": badge_name}).sort('_id', -1)), f'Tag: {badge_name}')
+    return render_full_list({"poster_badge": badge_name}, f'Tag: {badge_name}')
 
 @app.route('/genres')
+@conditional_get
 def genres_page():
     all_genres = movies.distinct("genres")
     all_genres = sorted([g for g in all_genres if g])
-    return render_template_string(genres_html, genres=all_genres, title="Browse by Genre")
+    return render_template("genres.html", genres=all_genres, title="Browse by Genre")
 
 @app.route('/genre/<genre_name>')
+@conditional_get
 def movies_by_genre(genre_name):
-    return render_full_list(list(movies.find({"genres": genre_name}).sort('_id', -1)), f'Genre: {genre_name}')
+    return render_full_list({"genres": genre_name}, f'Genre: {genre_name}')
 
 @app.route('/trending_movies')
+@conditional_get
 def trending_movies():
-    return render_full_list(list(movies.find({"is_trending": True, "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "Trending Now")
+    return render_full_list(LIST_QUERIES["trending_movies"], "Trending Now")
 
 @app.route('/movies_only')
+@conditional_get
 def movies_only():
-    return render_full_list(list(movies.find({"type": "movie", "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "All Movies")
+    return render_full_list(LIST_QUERIES["movies_only"], "All Movies")
 
 @app.route('/webseries')
+@conditional_get
 def webseries():
-    return render_full_list(list(movies.find({"type": "series", "is_coming_soon": {"$ne": True}}).sort('_id', -1)), "All Web Series")
+    return render_full_list(LIST_QUERIES["webseries"], "All Web Series")
 
 @app.route('/coming_soon')
+@conditional_get
 def coming_soon():
-    return render_full_list(list(movies.find({"is_coming_soon": True}).sort('_id', -1)), "Coming Soon")
+    return render_full_list(LIST_QUERIES["coming_soon"], "Coming Soon")
 
 @app.route('/recently_added')
+@conditional_get
 def recently_added_all():
-    return render_full_list(list(movies.find({"is_coming_soon": {"$ne": True}}).sort('_id', -1)), "Recently Added")
+    return render_full_list(LIST_QUERIES["recently_added_all"], "Recently Added")
+
+@app.route('/metrics')
+def metrics_endpoint():
+    token = os.getenv("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("Unauthorized", 401)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/poster/<int:width>/<token>')
+def poster(width, token):
+    url = poster_cache.resolve(token) if width in POSTER_WIDTHS else None
+    if not url: return "Poster not found", 404
+    found = poster_cache.path(url, width)
+    if not found: return redirect(asset_manifest.url("img/placeholder.svg"))
+    path, mimetype = found
+    response = send_file(path, mimetype=mimetype)
+    response.headers["Cache-Control"] = IMMUTABLE
+    return response
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    found = asset_manifest.lookup(filename, request.accept_encodings)
+    if not found: return "Asset not found", 404
+    body, mimetype, encoding = found
+    response = Response(body, mimetype=mimetype)
+    response.headers["Cache-Control"] = IMMUTABLE
+    response.vary.add("Accept-Encoding")
+    if encoding: response.headers["Content-Encoding"] = encoding
+    return response
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command == "ensure-indexes":
+        ensure_indexes()
+    elif command == "rebuild-related":
+        print(f"Related titles rebuilt for {related_titles.rebuild_all()} titles.")
+    elif command == "import":
+        if len(sys.argv) < 3:
+            print("Usage: python bot.py import <catalog.csv|catalog.jsonl>")
+            sys.exit(2)
+        with open(sys.argv[2], encoding="utf-8-sig", newline="") as f:
+            progress = import_catalog(read_rows(f, name=sys.argv[2]))
+        for error in progress["errors"]:
+            print(f"  skipped: {error}")
+    elif command == "retry-enrichment":
+        pending = list(movies.find({"enrichment_status": {"$in": ["pending", "retrying", "failed"]}}, {"_id": 1}))
+        for movie in pending: queue_enrichment(movie["_id"])
+        print(f"Queued enrichment for {len(pending)} titles.")
+    elif command == "normalize-episodes":
+        legacy = [m["_id"] for m in movies.find({"type": "series", "episode_count": {"$exists": False}}, {"_id": 1})]
+        for movie_id in legacy: normalize_stored_episodes(movie_id)
+        print(f"Sorted episodes of {len(legacy)} series.")
+    elif command == "backfill-trailers":
+        refresh_trailers()
+    elif command == "check-indexes":
+        ensure_indexes()
+        failed = check_query_plans()
+        if failed:
+            print(f"{len(failed)} catalog queries are not fully served by an index: {', '.join(failed)}")
+            sys.exit(1)
+    elif command == "serve":
+        import serve
+        serve.main(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    else:
+        ensure_indexes()
+        port = int(os.environ.get("PORT", 5000))
+        app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,218 @@
+"""
+Bulk catalog import for MovieZone.
+
+Rows come from a CSV file (header row) or JSON lines, using the same field
+names as the admin form. Rows are enriched on a bounded thread pool (TMDB
+calls are throttled by the TMDB client's token bucket) and written with
+insert_many in batches. Titles already in the catalog, or repeated in the
+file, are skipped by tmdb_id and by normalized title + type.
+"""
+import csv
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo.errors import BulkWriteError
+
+from episodes import normalize_episodes
+from search_index import normalize
+
+TRUE_VALUES = {"true", "1", "yes", "y", "on"}
+
+
+def read_rows(stream, fmt=None, name=""):
+    """Yields row dicts from a text stream of CSV or JSON lines; `fmt` defaults to the file extension."""
+    fmt = fmt or ("csv" if name.lower().endswith(".csv") else "jsonl")
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield {"_error": f"line {line_number}: {e}"}
+
+
+def _flag(value):
+    return value if isinstance(value, bool) else str(value or "").strip().lower() in TRUE_VALUES
+
+
+def _list(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").split(",") if v.strip()]
+
+
+def _text(row, *names):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def row_to_movie(row):
+    """Maps an import row onto a movie document, before TMDB enrichment. Raises ValueError for unusable rows."""
+    if "_error" in row:
+        raise ValueError(row["_error"])
+    title = _text(row, "title")
+    if not title:
+        raise ValueError("missing title")
+    content_type = _text(row, "type", "content_type") or "movie"
+    if content_type not in ("movie", "series"):
+        raise ValueError(f"unknown type {content_type!r}")
+    movie = {
+        "title": title,
+        "type": content_type,
+        "is_trending": _flag(row.get("is_trending")),
+        "is_coming_soon": _flag(row.get("is_coming_soon")),
+        "poster_badge": _text(row, "poster_badge"),
+        "poster": _text(row, "poster", "poster_url"),
+        "overview": _text(row, "overview"),
+        "release_date": _text(row, "release_date"),
+        "genres": _list(row.get("genres")),
+    }
+    if _text(row, "tmdb_id"):
+        try:
+            movie["tmdb_id"] = int(_text(row, "tmdb_id"))
+        except ValueError:
+            raise ValueError(f"bad tmdb_id {row.get('tmdb_id')!r}")
+    if content_type == "movie":
+        movie["watch_link"] = _text(row, "watch_link")
+        links = row.get("links")
+        if not isinstance(links, list):
+            links = [{"quality": quality, "url": _text(row, f"link_{quality}")}
+                     for quality in ("480p", "720p", "1080p") if _text(row, f"link_{quality}")]
+        movie["links"] = links
+    else:
+        episodes = row.get("episodes") or []
+        if isinstance(episodes, str):
+            episodes = json.loads(episodes)
+        movie["episodes"] = normalize_episodes(episodes)
+        movie["episode_count"] = len(episodes)
+    return movie
+
+
+def title_key(movie):
+    return (normalize(movie.get("title")), movie.get("type"))
+
+
+class BulkImporter:
+    """
+    `enrich(movie)` fills in TMDB details in place. `on_progress(progress)` is
+    called after every batch with the running counters. The ids of the
+    inserted titles are collected in `inserted_ids`.
+    """
+    def __init__(self, collection, enrich, workers=8, batch_size=500, on_progress=None):
+        self.collection = collection
+        self.enrich = enrich
+        self.workers = workers
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.progress = {"rows": 0, "inserted": 0, "duplicates": 0, "failed": 0, "errors": [],
+                         "rows_per_sec": 0.0, "elapsed": 0.0, "done": False}
+        self.inserted_ids = []
+        self._lock = threading.Lock()
+        self._started = None
+        self._tmdb_ids = set()
+        self._titles = set()
+
+    def _load_existing(self):
+        for doc in self.collection.find({}, {"title": 1, "type": 1, "tmdb_id": 1}):
+            self._titles.add(title_key(doc))
+            if doc.get("tmdb_id"):
+                self._tmdb_ids.add(doc["tmdb_id"])
+
+    def _claim(self, movie, key):
+        # Reserves the title (and tmdb_id) so a later duplicate in the same file is skipped.
+        with self._lock:
+            if key in self._titles or movie.get("tmdb_id") in self._tmdb_ids:
+                return False
+            self._titles.add(key)
+            if movie.get("tmdb_id"):
+                self._tmdb_ids.add(movie["tmdb_id"])
+            return True
+
+    def _prepare(self, row):
+        """Returns (movie or None, error or None); None for both means the row was a duplicate."""
+        try:
+            movie = row_to_movie(row)
+        except (ValueError, TypeError) as e:
+            return None, str(e)
+        except Exception as e:
+            # e.g. an episodes cell of the wrong shape; one bad row must not abort the whole import.
+            return None, f"malformed row: {e!r}"
+        key = title_key(movie)
+        with self._lock:
+            if key in self._titles or movie.get("tmdb_id") in self._tmdb_ids:
+                return None, None
+        try:
+            self.enrich(movie)
+        except Exception as e:
+            return None, f"{movie['title']}: {e}"
+        return (movie, None) if self._claim(movie, key) else (None, None)
+
+    def run(self, rows):
+        self._started = time.monotonic()
+        self._load_existing()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import") as pool:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._run_batch(pool, batch)
+                    batch = []
+            if batch:
+                self._run_batch(pool, batch)
+        self.progress["done"] = True
+        self._report()
+        return self.progress
+
+    def _run_batch(self, pool, rows):
+        docs = []
+        for movie, error in pool.map(self._prepare, rows):
+            if movie:
+                docs.append(movie)
+            elif error:
+                self._fail(error)
+            else:
+                self.progress["duplicates"] += 1
+        self.progress["rows"] += len(rows)
+        if docs:
+            try:
+                self.collection.insert_many(docs, ordered=False)
+                self.progress["inserted"] += len(docs)
+                self.inserted_ids += [doc["_id"] for doc in docs]
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                self.progress["inserted"] += e.details.get("nInserted", len(docs) - len(write_errors))
+                failed = {error.get("index") for error in write_errors}
+                self.inserted_ids += [doc["_id"] for i, doc in enumerate(docs) if i not in failed]
+                for error in write_errors:
+                    self._fail(error.get("errmsg", "write error"))
+        self._report()
+
+    def _fail(self, error):
+        self.progress["failed"] += 1
+        if len(self.progress["errors"]) < 50:
+            self.progress["errors"].append(error)
+
+    def _report(self):
+        elapsed = time.monotonic() - self._started
+        self.progress["elapsed"] = round(elapsed, 2)
+        self.progress["rows_per_sec"] = round(self.progress["rows"] / elapsed, 1) if elapsed else 0.0
+        p = self.progress
+        print(f"Import: {p['rows']} rows, {p['inserted']} inserted, {p['duplicates']} duplicates, "
+              f"{p['failed']} failed, {p['rows_per_sec']} rows/s")
+        if self.on_progress:
+            self.on_progress(dict(p))
+
+
+def open_text(data):
+    """Wraps uploaded bytes as a text stream (UTF-8, BOM tolerated)."""
+    return io.StringIO(data.decode("utf-8-sig"))
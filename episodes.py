@@ -0,0 +1,33 @@
+"""
+Episode helpers for MovieZone series.
+
+Episodes are stored sorted by number, with `episode_count` on the document,
+so the detail page can read one range with a $slice projection and the
+watch page can fetch a single episode with $elemMatch.
+"""
+
+
+def _number(episode):
+    try:
+        return int(episode.get("episode_number"))
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_episodes(episodes):
+    """Returns `episodes` with integer numbers, sorted by number (unnumbered episodes last)."""
+    for episode in episodes:
+        number = _number(episode)
+        if number is not None:
+            episode["episode_number"] = number
+    return sorted(episodes, key=lambda e: (_number(e) is None, _number(e) or 0))
+
+
+def episode_ranges(episodes, page_size):
+    """
+    [(page, first, last)] for the range links of a series, labelled by the numbers of the
+    first and last episode on each page of `episodes` (stored order); unnumbered ones use their position.
+    """
+    labels = [i + 1 if _number(episode) is None else _number(episode) for i, episode in enumerate(episodes)]
+    return [(i // page_size + 1, labels[i], labels[min(i + page_size, len(labels)) - 1])
+            for i in range(0, len(labels), page_size)]
@@ -0,0 +1,134 @@
+"""
+Buffered feedback writes for MovieZone.
+
+Contact-form submissions are queued in memory and written with one
+insert_many per batch, flushed when `max_batch` items are waiting, every
+`flush_interval` seconds, and at shutdown. Each process has its own buffer.
+Documents that fail to insert are retried up to `max_attempts` times.
+Identical messages carry the same duplicate_key() within a period; the unique
+index on it turns repeats into duplicate-key errors, which the batch insert
+(ordered=False) skips without extra writes, whichever worker took them.
+"""
+import atexit
+import hashlib
+import os
+import threading
+import time
+
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+
+from search_index import normalize
+
+DUPLICATE_KEY = 11000
+
+
+def duplicate_key(window, *parts):
+    """
+    Hash of `parts` and the current `window`-second period. Stored as dedup_key under a
+    unique index, so a repeat within the period fails its insert and is dropped as a duplicate.
+    """
+    text = "\x1f".join([str(int(time.time() // window))] + [normalize(str(p or "")) for p in parts])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class BufferedWriter:
+    def __init__(self, collection, max_batch=100, flush_interval=2.0, max_pending=10000, max_attempts=5):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.counters = {"accepted": 0, "dropped_overflow": 0, "dropped_failed": 0, "duplicates": 0,
+                         "flushed": 0, "batches": 0, "flush_errors": 0}
+        self._pending = []
+        self._attempts = {}  # _id -> failed inserts, for documents waiting to be retried
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        atexit.register(self.flush)
+
+    def add(self, doc):
+        """Queues `doc`; returns False if the buffer is full and the document was dropped."""
+        self._start()
+        # A client-side _id makes a retry of a half-written batch safe: written documents come back as E11000.
+        doc.setdefault("_id", ObjectId())
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.counters["dropped_overflow"] += 1
+                return False
+            self._pending.append(doc)
+            self.counters["accepted"] += 1
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                if not batch:
+                    return
+                try:
+                    self.collection.insert_many(batch, ordered=False)
+                    retry, failed = [], 0
+                except BulkWriteError as e:
+                    # ordered=False writes every document without an error of its own. A duplicate key
+                    # is a repeated message or a document an interrupted flush already stored; only
+                    # the other errors are retried.
+                    codes = {error["index"]: error["code"] for error in e.details.get("writeErrors", [])}
+                    retry, failed = [doc for i, doc in enumerate(batch) if codes.get(i, DUPLICATE_KEY) != DUPLICATE_KEY], len(codes)
+                    self.counters["duplicates"] += sum(code == DUPLICATE_KEY for code in codes.values())
+                    if retry:
+                        print(f"Feedback flush failed for {len(retry)} of {len(batch)} items: {e}")
+                except Exception as e:
+                    # Part of the batch may be written; the retry reports those as duplicate keys.
+                    retry, failed = batch, len(batch)
+                    print(f"Feedback flush failed ({len(batch)} items): {e}")
+                self.counters["flushed"] += len(batch) - failed
+                self.counters["batches"] += 1
+                retried = {doc["_id"] for doc in retry}
+                for doc in batch:
+                    if doc["_id"] not in retried:
+                        self._attempts.pop(doc["_id"], None)
+                if retry:
+                    self.counters["flush_errors"] += 1
+                    self._requeue(retry)
+                    return
+
+    def _requeue(self, docs):
+        """Puts `docs` back at the front for the next flush, dropping those that failed max_attempts times."""
+        keep = []
+        for doc in docs:
+            attempts = self._attempts[doc["_id"]] = self._attempts.get(doc["_id"], 0) + 1
+            if attempts < self.max_attempts:
+                keep.append(doc)
+            else:
+                self._attempts.pop(doc["_id"])
+                self.counters["dropped_failed"] += 1
+                print(f"Feedback dropped after {attempts} failed inserts: {doc['_id']}")
+        with self._lock:
+            self._pending[:0] = keep
+
+    def _start(self):
+        # The flusher thread does not survive a fork; each process starts its own on first use.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pending, self._attempts = [], {}
+        threading.Thread(target=self._run, name="feedback-flush", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self):
+        return dict(self.counters, pending=len(self._pending))
@@ -0,0 +1,137 @@
+"""
+Background job queue for MovieZone, persisted in a Mongo collection.
+
+Jobs are plain documents, so they survive restarts and any process can run
+them. Workers claim a job atomically with find_one_and_update and hold it for
+a lease; a job whose worker died is picked up again once the lease runs out.
+Failures are retried with exponential backoff until `max_attempts`.
+Several queues may share one collection; each only claims the kinds it has
+handlers registered for.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    def __init__(self, collection, workers=2, max_attempts=5, base_delay=30, max_delay=3600,
+                 lease_seconds=300, poll_interval=5, keep_done_days=7):
+        self.collection = collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.keep_done_days = keep_done_days
+        self.counters = {"enqueued": 0, "done": 0, "retried": 0, "failed": 0}
+        self._handlers = {}
+        self._wake = threading.Event()
+        self._started_pid = None
+        self._lock = threading.Lock()
+
+    def register(self, kind, handler, on_error=None):
+        """`handler(payload)` runs a job; `on_error(payload, error, final)` is told about each failed attempt."""
+        self._handlers[kind] = (handler, on_error)
+
+    def ensure_indexes(self):
+        self.collection.create_index([("status", 1), ("run_after", 1)])
+        self.collection.create_index([("key", 1), ("status", 1)])
+        # Finished jobs are removed by Mongo after keep_done_days.
+        self.collection.create_index("finished_at", expireAfterSeconds=self.keep_done_days * 86400)
+
+    def enqueue(self, kind, payload, key=None):
+        """Queues a job; a job with the same `key` that is still waiting is reused instead of duplicated."""
+        now = datetime.utcnow()
+        job = {"kind": kind, "payload": payload, "status": QUEUED, "attempts": 0, "run_after": now, "created_at": now}
+        if key:
+            self.collection.update_one({"key": key, "status": QUEUED}, {"$setOnInsert": dict(job, key=key)}, upsert=True)
+        else:
+            self.collection.insert_one(job)
+        self.counters["enqueued"] += 1
+        self._wake.set()
+
+    def start(self):
+        # Threads do not survive a fork, so every process starts its own workers.
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True).start()
+
+    def claim(self):
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"kind": {"$in": list(self._handlers)},
+             "$or": [
+                {"status": QUEUED, "run_after": {"$lte": now}},
+                {"status": RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {"$set": {"status": RUNNING, "lease_until": now + timedelta(seconds=self.lease_seconds)},
+             "$inc": {"attempts": 1}},
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def extend_lease(self, key):
+        """Lets a long job keep its claim; call it more often than every `lease_seconds`."""
+        self.collection.update_one({"key": key, "status": RUNNING},
+                                   {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}})
+
+    def run_one(self):
+        """Claims and runs one due job; returns False when nothing was due."""
+        job = self.claim()
+        if not job:
+            return False
+        handler, on_error = self._handlers.get(job["kind"], (None, None))
+        try:
+            if handler is None:
+                raise LookupError(f"no handler for job kind {job['kind']!r}")
+            handler(job["payload"])
+        except Exception as e:
+            self._failed(job, e, on_error)
+        else:
+            self.collection.update_one({"_id": job["_id"]}, {"$set": {"status": DONE, "finished_at": datetime.utcnow()},
+                                                             "$unset": {"lease_until": ""}})
+            self.counters["done"] += 1
+        return True
+
+    def _failed(self, job, error, on_error):
+        final = job["attempts"] >= self.max_attempts
+        update = {"last_error": str(error)[:500]}
+        if final:
+            update.update(status=FAILED, finished_at=datetime.utcnow())
+            self.counters["failed"] += 1
+        else:
+            delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+            update.update(status=QUEUED, run_after=datetime.utcnow() + timedelta(seconds=delay))
+            self.counters["retried"] += 1
+        self.collection.update_one({"_id": job["_id"]}, {"$set": update, "$unset": {"lease_until": ""}})
+        print(f"Job {job['kind']} {job['_id']} failed (attempt {job['attempts']}): {error}")
+        if on_error:
+            try:
+                on_error(job["payload"], error, final)
+            except Exception as e:
+                print(f"Job error hook failed: {e}")
+
+    def _work(self):
+        while True:
+            try:
+                if self.run_one():
+                    continue
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def stats(self):
+        by_status = {row["_id"]: row["count"] for row in self.collection.aggregate(
+            [{"$match": {"kind": {"$in": list(self._handlers)}}},
+             {"$group": {"_id": "$status", "count": {"$sum": 1}}}])}
+        return {"jobs": {status: by_status.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)},
+                "this_process": dict(self.counters)}
@@ -0,0 +1,209 @@
+"""
+Prometheus metrics for MovieZone.
+
+Counters and histograms are kept in per-thread shards: a thread only ever
+writes its own dicts, so recording a value takes no lock. A scrape sums the
+shards of every thread. When a thread exits, its shard is folded into a shared
+base. Under serve.py each worker process also writes its totals to METRICS_DIR
+every few seconds, and /metrics adds up the files of all workers.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    def __init__(self, namespace="moviezone", buckets=LATENCY_BUCKETS, snapshot_dir=None, snapshot_interval=5):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_interval = snapshot_interval
+        self._help = {}
+        self._local = threading.local()
+        self._shards = {}  # id -> shard of every live thread
+        self._base = ({}, {})  # counts of threads that have exited
+        self._shards_lock = threading.Lock()
+        self._snapshot_pid = None
+
+    def describe(self, name, kind, help_text):
+        self._help[f"{self.namespace}_{name}"] = (kind, help_text)
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # The lock is only taken once per thread, when its shard is registered.
+            shard = self._local.shard = ({}, {})
+            # The owner is freed with the thread's locals, so its finalizer runs once the thread exits.
+            owner = self._local.owner = _Owner()
+            with self._shards_lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        # Servers that start a thread per request would otherwise keep one shard per request served.
+        with self._shards_lock:
+            self._shards.pop(id(shard), None)
+            _merge(self._base, shard)
+
+    def inc(self, name, labels=(), value=1):
+        counters = self._shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard()[1]
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+
+    def totals(self):
+        """Sums every shard of this process into ({key: value}, {key: [bucket counts, sum]})."""
+        totals = ({}, {})
+        with self._shards_lock:
+            _merge(totals, self._base)
+            shards = list(self._shards.values())
+        for shard in shards:
+            _merge(totals, shard)
+        return totals
+
+    # --- Multi-process snapshots ---
+
+    def start_snapshots(self):
+        if not self.snapshot_dir or self._snapshot_pid == os.getpid():
+            return
+        self._snapshot_pid = os.getpid()
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True).start()
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                print(f"Metrics snapshot failed: {e}")
+
+    def write_snapshot(self):
+        counters, histograms = self.totals()
+        data = {"counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+                "histograms": [[name, list(labels), counts, total] for (name, labels), (counts, total) in histograms.items()]}
+        path = os.path.join(self.snapshot_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+    def _all_processes(self):
+        if not self.snapshot_dir:
+            return self.totals()
+        self.write_snapshot()
+        counters, histograms = {}, {}
+        for name in os.listdir(self.snapshot_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.snapshot_dir, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric, labels, value in data["counters"]:
+                key = (metric, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0) + value
+            for metric, labels, counts, total in data["histograms"]:
+                key = (metric, tuple(tuple(label) for label in labels))
+                merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+        return counters, histograms
+
+    # --- Exposition ---
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        counters, histograms = self._all_processes()
+        lines, seen = [], set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                help_text = self._help.get(name, (kind, name))[1]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            full = f"{self.namespace}_{name}"
+            header(full, "counter")
+            lines.append(f"{full}{_labels(labels)} {_number(value)}")
+        for (name, labels), (counts, total) in sorted(histograms.items()):
+            full = f"{self.namespace}_{name}"
+            header(full, "histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{full}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{full}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{full}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class _Owner:
+    """Per-thread sentinel whose finalizer retires the thread's shard."""
+
+
+def _merge(into, shard):
+    counters, histograms = into
+    for key, value in list(shard[0].items()):
+        counters[key] = counters.get(key, 0) + value
+    for key, (counts, total) in list(shard[1].items()):
+        merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+        merged[0] = [a + b for a, b in zip(merged[0], counts)]
+        merged[1] += total
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records the duration of every Mongo command, labelled by collection and command name."""
+    def __init__(self, metrics):
+        self.metrics = metrics
+        # request_id -> collection; set and popped from different threads, which plain dict operations allow.
+        self._collections = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = event.command.get("collection", "-")  # getMore names the collection separately
+        self._collections[event.request_id] = target
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+    def _record(self, event, outcome):
+        collection = self._collections.pop(event.request_id, "-")
+        labels = (("collection", collection), ("command", event.command_name))
+        self.metrics.observe("mongo_command_duration_seconds", labels, event.duration_micros / 1e6)
+        if outcome == "error":
+            self.metrics.inc("mongo_command_errors_total", labels)
@@ -0,0 +1,213 @@
+"""
+Local poster thumbnails for MovieZone.
+
+Each poster URL is downloaded once and resized into a few widths, stored in an
+on-disk cache that is trimmed least-recently-used first. Without Pillow the
+original bytes are kept, and their type is read from the file header. Poster
+URLs are carried in signed tokens, so /poster/<width>/<token> can only fetch
+URLs the app itself rendered.
+"""
+import base64
+import hashlib
+import hmac
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+POSTER_WIDTHS = (185, 342, 500)
+TMDB_SIZE_RE = re.compile(r"(image\.tmdb\.org/t/p/)(w\d+|original)/")
+# Cached file extension per type; Pillow always writes JPEG, without it the original type is kept.
+EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/gif": "gif"}
+
+
+def image_type(data):
+    """Returns the mimetype of `data` from its first bytes, or None if it is not a supported image."""
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return None
+
+
+class PosterCache:
+    def __init__(self, cache_dir, secret, max_bytes=1024 * 1024 * 1024, timeout=10, observer=None):
+        self.cache_dir = cache_dir
+        self.secret = secret.encode()
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        # observer(outcome, seconds) is told about every download: "ok" or "error".
+        self.observer = observer
+        self.counters = {"hits": 0, "misses": 0, "errors": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(64)]
+        self._files = OrderedDict()
+        self._total = 0
+        self._session = None
+        self._pid = None
+        os.makedirs(cache_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if os.path.isfile(path) and not name.endswith(".tmp"):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+        self.token = lru_cache(maxsize=50000)(self._token)
+
+    def _token(self, url):
+        payload = base64.urlsafe_b64encode(url.encode()).rstrip(b"=").decode()
+        return f"{self._sign(url)}.{payload}"
+
+    def _sign(self, url):
+        return hmac.new(self.secret, url.encode(), hashlib.sha256).hexdigest()[:20]
+
+    def resolve(self, token):
+        """Returns the poster URL inside `token`, or None if the signature does not match."""
+        signature, _, payload = token.partition(".")
+        try:
+            url = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)).decode()
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return url if hmac.compare_digest(signature, self._sign(url)) else None
+
+    def path(self, url, width):
+        """
+        Returns (file, mimetype) for `url` at `width`, downloading and resizing it on
+        first use, or None if the poster cannot be fetched or decoded.
+        """
+        key = hashlib.sha1(url.encode()).hexdigest()
+        found = self._cached(key, width)
+        if found:
+            self.counters["hits"] += 1
+            return found
+        with self._key_lock(key):
+            found = self._cached(key, width)
+            if found:
+                self.counters["hits"] += 1
+                return found
+            self.counters["misses"] += 1
+            try:
+                data, mimetype = self._render(url, key, width)
+                name = f"{key}_{width}.{EXTENSIONS[mimetype]}"
+                self._store(name, data)
+            except (requests.RequestException, OSError, ValueError) as e:
+                self.counters["errors"] += 1
+                print(f"Poster fetch failed for {url}: {e}")
+                return None
+        return os.path.join(self.cache_dir, name), mimetype
+
+    def _cached(self, key, width):
+        mimetypes = ("image/jpeg",) if Image is not None else EXTENSIONS
+        for mimetype in mimetypes:
+            name = f"{key}_{width}.{EXTENSIONS[mimetype]}"
+            if self._touch(name):
+                return os.path.join(self.cache_dir, name), mimetype
+        return None
+
+    def _render(self, url, key, width):
+        """Returns (data, mimetype); raises ValueError for anything that is not a supported image."""
+        if Image is None:
+            # Without Pillow, ask TMDB for the size directly; other hosts are served as-is.
+            data = self._download(TMDB_SIZE_RE.sub(rf"\1w{width}/", url))
+            mimetype = image_type(data)
+            if mimetype is None:
+                raise ValueError("response is not a JPEG, PNG, WebP or GIF image")
+            return data, mimetype
+        source_name = f"{key}_src"
+        if self._touch(source_name):
+            with open(os.path.join(self.cache_dir, source_name), "rb") as f:
+                source = f.read()
+        else:
+            source = self._download(url)
+            self._store(source_name, source)
+        try:
+            with Image.open(io.BytesIO(source)) as image:
+                image = image.convert("RGB")
+                if image.width > width:
+                    image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+                out = io.BytesIO()
+                image.save(out, "JPEG", quality=82, optimize=True, progressive=True)
+        except Exception as e:
+            # Pillow raises many types for bad input (UnidentifiedImageError, DecompressionBombError, SyntaxError, ...).
+            # The source is dropped so a truncated download is fetched again next time.
+            self._remove(source_name)
+            raise ValueError(f"cannot decode image: {e!r}") from e
+        return out.getvalue(), "image/jpeg"
+
+    def _download(self, url):
+        if self._pid != os.getpid():
+            self._session, self._pid = requests.Session(), os.getpid()
+        started = time.perf_counter()
+        try:
+            res = self._session.get(url, timeout=self.timeout)
+            res.raise_for_status()
+        except requests.RequestException:
+            if self.observer:
+                self.observer("error", time.perf_counter() - started)
+            raise
+        if self.observer:
+            self.observer("ok", time.perf_counter() - started)
+        return res.content
+
+    def _key_lock(self, key):
+        # Striped locks: one download per poster at a time without a lock per URL.
+        return self._key_locks[int(key[:8], 16) % len(self._key_locks)]
+
+    def _touch(self, name):
+        try:
+            os.utime(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            # Another process may have evicted it.
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+            return False
+        with self._lock:
+            if name in self._files:
+                self._files.move_to_end(name)
+        return True
+
+    def _store(self, name, data):
+        path = os.path.join(self.cache_dir, name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._total -= size
+                self.counters["evictions"] += 1
+                try:
+                    os.remove(os.path.join(self.cache_dir, old))
+                except FileNotFoundError:
+                    pass
+
+    def _remove(self, name):
+        with self._lock:
+            self._total -= self._files.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        return dict(self.counters, files=len(self._files), bytes=self._total, max_bytes=self.max_bytes, pillow=Image is not None)
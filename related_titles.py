@@ -0,0 +1,192 @@
+"""
+Precomputed "You Might Also Like" neighbors for MovieZone.
+
+Every title keeps its top-K neighbors in a `related` array on its own document,
+with the card fields embedded, so the detail page gets them with the same
+find_one that loads the title. Scores combine genre Jaccard similarity, same
+content type and release-year proximity.
+"""
+import bisect
+import heapq
+
+from pymongo import UpdateMany, UpdateOne
+
+FEATURE_FIELDS = {"title": 1, "poster": 1, "poster_badge": 1, "genres": 1, "type": 1, "release_date": 1}
+
+GENRE_WEIGHT = 0.7
+TYPE_WEIGHT = 0.15
+YEAR_WEIGHT = 0.15
+YEAR_SPAN = 10
+
+
+def _year(release_date):
+    try:
+        return int(str(release_date)[:4])
+    except (TypeError, ValueError):
+        return None
+
+
+def _features(doc, genre_bits):
+    """(genre bitmask, type, year); `genre_bits` assigns a bit to every genre seen so far."""
+    mask = 0
+    for genre in doc.get("genres") or []:
+        mask |= genre_bits.setdefault(genre, 1 << len(genre_bits))
+    return mask, doc.get("type"), _year(doc.get("release_date"))
+
+
+def score(a, b):
+    """Similarity of two feature tuples; 0 when they share no genre."""
+    genres_a, type_a, year_a = a
+    genres_b, type_b, year_b = b
+    shared = (genres_a & genres_b).bit_count()
+    if not shared:
+        return 0.0
+    value = GENRE_WEIGHT * shared / (genres_a | genres_b).bit_count()
+    if type_a == type_b:
+        value += TYPE_WEIGHT
+    if year_a and year_b:
+        value += YEAR_WEIGHT * max(0.0, 1 - abs(year_a - year_b) / YEAR_SPAN)
+    return value
+
+
+def _entry(doc, value):
+    return {"_id": doc["_id"], "score": round(value, 4), "title": doc.get("title"),
+            "poster": doc.get("poster"), "poster_badge": doc.get("poster_badge")}
+
+
+def _top(entries, k):
+    # Highest score first; newer titles win ties.
+    return sorted(entries, key=lambda e: (e["score"], e["_id"]), reverse=True)[:k]
+
+
+def compute_related(docs, k=12, window=50):
+    """
+    Yields (id, related list) for every document in `docs` ({_id: doc with
+    FEATURE_FIELDS}). Each title is compared with `window` titles on either
+    side of its year, per genre.
+    """
+    genre_bits = {}
+    features = {doc_id: _features(doc, genre_bits) for doc_id, doc in docs.items()}
+    by_genre = {}
+    for doc_id, doc in docs.items():
+        for genre in set(doc.get("genres") or []):
+            by_genre.setdefault(genre, []).append((features[doc_id][2] or 0, doc_id))
+    for entries in by_genre.values():
+        entries.sort()
+
+    for doc_id, feats in features.items():
+        candidates = set()
+        for genre in set(docs[doc_id].get("genres") or []):
+            entries = by_genre[genre]
+            pos = bisect.bisect_left(entries, (feats[2] or 0, doc_id))
+            candidates.update(other for _, other in entries[max(0, pos - window):pos + window + 1])
+        candidates.discard(doc_id)
+        best = heapq.nlargest(k, ((score(feats, features[other]), other) for other in candidates))
+        yield doc_id, [_entry(docs[other], value) for value, other in best]
+
+
+class RelatedTitles:
+    def __init__(self, collection, k=12, candidate_limit=2000, window=50):
+        self.collection = collection
+        self.k = k
+        # Incremental updates compare against the newest `candidate_limit` titles sharing a genre.
+        self.candidate_limit = candidate_limit
+        # A full rebuild compares each title with `window` titles on either side of its year, per genre.
+        self.window = window
+
+    def rebuild_all(self, batch_size=1000):
+        docs = {d["_id"]: d for d in self.collection.find({}, FEATURE_FIELDS)}
+        ops, updated = [], 0
+        for doc_id, related in compute_related(docs, self.k, self.window):
+            ops.append(UpdateOne({"_id": doc_id}, {"$set": {"related": related}}))
+            if len(ops) >= batch_size:
+                self.collection.bulk_write(ops, ordered=False)
+                updated += len(ops)
+                ops = []
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+        return updated
+
+    def on_upsert(self, movie_id):
+        """Recomputes the neighbors of `movie_id` and merges it into the lists of the titles it is related to."""
+        doc = self.collection.find_one({"_id": movie_id}, FEATURE_FIELDS)
+        if not doc:
+            return
+        genre_bits = {}
+        feats = _features(doc, genre_bits)
+        fields = dict(FEATURE_FIELDS, related=1)
+        candidates = {}
+        if doc.get("genres"):
+            query = {"genres": {"$in": doc["genres"]}, "_id": {"$ne": movie_id}}
+            for other in self.collection.find(query, fields).sort("_id", -1).limit(self.candidate_limit):
+                candidates[other["_id"]] = other
+        for other in self.collection.find({"related._id": movie_id}, fields):
+            candidates[other["_id"]] = other
+
+        ops, neighbors = [], []
+        for other_id, other in candidates.items():
+            value = score(feats, _features(other, genre_bits))
+            if value:
+                neighbors.append(_entry(other, value))
+            current = other.get("related") or []
+            merged = [e for e in current if e["_id"] != movie_id]
+            if value:
+                merged = _top(merged + [_entry(doc, value)], self.k)
+            if merged != current:
+                ops.append(UpdateOne({"_id": other_id}, {"$set": {"related": merged}}))
+        ops.append(UpdateOne({"_id": movie_id}, {"$set": {"related": _top(neighbors, self.k)}}))
+        self.collection.bulk_write(ops, ordered=False)
+
+    def on_insert(self, movie_ids, rebuild_above=200):
+        """
+        Fits newly inserted titles (e.g. a bulk import) into the neighbor lists. Each new title is
+        scored against the newest `candidate_limit` titles of each of its genres and against the other
+        new titles, and those candidates take the new titles into their own lists. Past `rebuild_above`
+        new titles a full rebuild is cheaper.
+        """
+        if len(movie_ids) > rebuild_above:
+            return self.rebuild_all()
+        new = {d["_id"]: d for d in self.collection.find({"_id": {"$in": list(movie_ids)}}, FEATURE_FIELDS)}
+        fields = dict(FEATURE_FIELDS, related=1)
+        pool = {}
+        for genre in {g for d in new.values() for g in d.get("genres") or []}:
+            query = {"genres": genre, "_id": {"$nin": list(new)}}
+            for other in self.collection.find(query, fields).sort("_id", -1).limit(self.candidate_limit):
+                pool[other["_id"]] = other
+        genre_bits = {}
+        feats = {doc_id: _features(doc, genre_bits) for doc_id, doc in list(pool.items()) + list(new.items())}
+
+        ops, changed = [], {}
+        for doc_id, doc in new.items():
+            neighbors = []
+            for other_id, other in list(pool.items()) + list(new.items()):
+                value = score(feats[doc_id], feats[other_id]) if other_id != doc_id else 0
+                if not value:
+                    continue
+                neighbors.append(_entry(other, value))
+                if other_id in pool:
+                    current = changed.get(other_id, other.get("related") or [])
+                    changed[other_id] = _top(current + [_entry(doc, value)], self.k)
+            ops.append(UpdateOne({"_id": doc_id}, {"$set": {"related": _top(neighbors, self.k)}}))
+        for other_id, related in changed.items():
+            if related != (pool[other_id].get("related") or []):
+                ops.append(UpdateOne({"_id": other_id}, {"$set": {"related": related}}))
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return len(new)
+
+    def on_delete(self, movie_id):
+        self.collection.update_many({"related._id": movie_id}, {"$pull": {"related": {"_id": movie_id}}})
+
+    @staticmethod
+    def delete_op(movie_ids):
+        """Write op that drops `movie_ids` from every related list, for bulk_write next to the delete itself."""
+        return UpdateMany({"related._id": {"$in": movie_ids}}, {"$pull": {"related": {"_id": {"$in": movie_ids}}}})
+
+    @staticmethod
+    def card_update_op(movie_ids, values):
+        """Write op that copies changed card fields (e.g. poster_badge) into the embedded entries of `movie_ids`."""
+        return UpdateMany({"related._id": {"$in": movie_ids}},
+                          {"$set": {f"related.$[r].{field}": value for field, value in values.items()}},
+                          array_filters=[{"r._id": {"$in": movie_ids}}])
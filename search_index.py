@@ -0,0 +1,274 @@
+"""
+In-memory title search for MovieZone.
+
+Titles are split into padded character trigrams and kept in an inverted index
+(trigram -> title positions, with bitmasks for common trigrams). A query is
+answered by counting shared trigrams per title with bitwise adds, which makes
+it tolerant to typos and never runs user input as a regex.
+PrefixIndex answers typeahead lookups from a sorted key array with bisect.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+
+MAX_QUERY_LENGTH = 100
+NONZERO_BYTE = re.compile(rb"[^\x00]")
+BITS_HIGH_FIRST = [tuple(bit for bit in range(7, -1, -1) if byte >> bit & 1) for byte in range(256)]
+
+
+def normalize(text):
+    """Case-folds `text` and collapses punctuation to single spaces (combining marks are kept for Bengali)."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    chars = [c if c.isalnum() or unicodedata.category(c).startswith("M") else " " for c in text]
+    return " ".join("".join(chars).split())
+
+
+def trigrams(normalized):
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TitleSearchIndex:
+    """
+    Each title gets a bit position. A trigram's postings are a set of positions,
+    and common trigrams also keep them as an int bitmask. A search adds the
+    query's masks bit-parallel, so the number of shared trigrams per title is
+    known without a per-title loop. Masks are immutable, so the lock is only
+    held while they are collected; counting and scoring run outside it.
+    """
+    def __init__(self, min_coverage=0.5, max_candidates=1000):
+        # A title is a candidate when it contains at least this share of the query's trigrams.
+        self.min_coverage = min_coverage
+        # Titles scored per query (at least `limit`), taken by shared trigrams and then newest first.
+        self.max_candidates = max_candidates
+        self._postings = {}  # trigram -> set of positions
+        self._masks = {}  # trigram -> bitmask of positions, for trigrams in many titles
+        self._slots = []  # position -> doc id (None once removed)
+        self._docs = {}  # doc id -> (normalized title, trigram count, trigrams, position)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, title):
+        normalized = normalize(title)
+        grams = trigrams(normalized)
+        with self._lock:
+            self._remove(doc_id)
+            pos = len(self._slots)
+            self._slots.append(doc_id)
+            self._docs[doc_id] = (normalized, len(grams), grams, pos)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(pos)
+                if gram in self._masks:
+                    self._masks[gram] |= 1 << pos
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        entry = self._docs.pop(doc_id, None)
+        if not entry:
+            return
+        pos = entry[3]
+        self._slots[pos] = None
+        for gram in entry[2]:
+            positions = self._postings.get(gram)
+            if positions is not None:
+                positions.discard(pos)
+                if not positions:
+                    del self._postings[gram]
+                    self._masks.pop(gram, None)
+                elif gram in self._masks:
+                    self._masks[gram] &= ~(1 << pos)
+
+    def _mask(self, gram):
+        """Bitmask of the titles containing `gram`; kept for trigrams in at least 1/128 of the titles."""
+        mask = self._masks.get(gram)
+        if mask is None:
+            positions = self._postings.get(gram, ())
+            bits = bytearray(len(self._slots) // 8 + 1)
+            for pos in positions:
+                bits[pos >> 3] |= 1 << (pos & 7)
+            mask = int.from_bytes(bits, "little")
+            if len(positions) >= max(64, len(self._slots) // 128):
+                self._masks[gram] = mask
+        return mask
+
+    def search(self, query, limit=100):
+        """Returns up to `limit` doc ids, best match first (ties go to the newest id)."""
+        normalized = normalize(query[:MAX_QUERY_LENGTH])
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+        with self._lock:
+            masks = [self._mask(gram) for gram in query_grams]
+            slots, size = self._slots, len(self._slots)
+        threshold = max(1, math.ceil(len(query_grams) * self.min_coverage))
+        planes = _bit_counts(masks)
+        # Titles sharing the most trigrams come first; a very common query ("the") keeps the newest ones.
+        wanted = max(self.max_candidates, limit)
+        candidates, above = [], 0
+        for shared in range(len(query_grams), threshold - 1, -1):
+            at_least = _at_least(planes, shared, (1 << size) - 1)
+            candidates.extend((pos, shared) for pos in _positions_newest_first(at_least ^ above, wanted - len(candidates)))
+            above = at_least
+            if len(candidates) >= wanted:
+                break
+        scored = []
+        for pos, shared in candidates:
+            entry = self._docs.get(slots[pos])
+            if entry is None or entry[3] != pos:
+                continue  # removed or re-added since the masks were taken
+            title, gram_count = entry[0], entry[1]
+            coverage = shared / len(query_grams)
+            jaccard = shared / (len(query_grams) + gram_count - shared)
+            score = coverage + jaccard
+            if normalized in title:
+                score += 1.0
+                if title.startswith(normalized):
+                    score += 0.5
+                if title == normalized:
+                    score += 0.5
+            scored.append((score, slots[pos]))
+        return [doc_id for _, doc_id in heapq.nlargest(limit, scored)]
+
+
+def _bit_counts(masks):
+    """Adds the masks bit-parallel: bit p of planes[j] is bit j of how many masks have bit p set."""
+    planes = []
+    for carry in masks:
+        for j in range(len(planes)):
+            if not carry:
+                break
+            planes[j], carry = planes[j] ^ carry, planes[j] & carry
+        else:
+            if carry:
+                planes.append(carry)
+    return planes
+
+
+def _at_least(planes, count, full):
+    """Bitmask of the positions whose count in `planes` is at least `count`."""
+    if count >> len(planes):
+        return 0
+    greater, equal = 0, full
+    for j in reversed(range(len(planes))):
+        if count >> j & 1:
+            equal &= planes[j]
+        else:
+            greater |= equal & planes[j]
+            equal &= ~planes[j]
+    return greater | equal
+
+
+def _positions_newest_first(mask, limit):
+    """Up to `limit` set bit positions of `mask`, highest first (titles added later sit higher)."""
+    if not mask or limit <= 0:
+        return []
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")[::-1]
+    positions = []
+    last = len(data) - 1
+    for match in NONZERO_BYTE.finditer(data):
+        start = match.start()
+        base = (last - start) * 8
+        positions.extend(base + bit for bit in BITS_HIGH_FIRST[data[start]])
+        if len(positions) >= limit:
+            return positions[:limit]
+    return positions
+
+
+def build_title_index(items):
+    """Builds a fresh index from `(doc_id, title)` pairs, oldest first so newer titles get higher positions."""
+    index = TitleSearchIndex()
+    for doc_id, title in sorted(items):
+        index.add(doc_id, title)
+    # Masks for the common trigrams are made up front, not under the lock on the first searches.
+    common = max(64, len(index._slots) // 128)
+    for gram, positions in index._postings.items():
+        if len(positions) >= common:
+            index._mask(gram)
+    return index
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized title keys for typeahead. Every word start of a
+    title is a key, so "knight" finds "The Dark Knight".
+    """
+    def __init__(self):
+        self._keys = []
+        self._ids = []
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _keys_for(title):
+        words = normalize(title).split()
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def add(self, doc_id, title, poster=None):
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = (title, poster)
+            for key in self._keys_for(title):
+                pos = bisect.bisect_left(self._keys, key)
+                self._keys.insert(pos, key)
+                self._ids.insert(pos, doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        entry = self._docs.pop(doc_id, None)
+        if not entry:
+            return
+        for key in self._keys_for(entry[0]):
+            pos = bisect.bisect_left(self._keys, key)
+            while pos < len(self._keys) and self._keys[pos] == key:
+                if self._ids[pos] == doc_id:
+                    del self._keys[pos]
+                    del self._ids[pos]
+                    break
+                pos += 1
+
+    def suggest(self, query, limit=8):
+        """Returns `(doc_id, title, poster)` for titles with a word starting with `query`; title-start matches first."""
+        prefix = normalize(query[:MAX_QUERY_LENGTH])
+        if not prefix:
+            return []
+        matches = {}
+        with self._lock:
+            pos = bisect.bisect_left(self._keys, prefix)
+            while pos < len(self._keys) and self._keys[pos].startswith(prefix) and len(matches) < limit * 5:
+                doc_id = self._ids[pos]
+                if doc_id not in matches:
+                    title, poster = self._docs[doc_id]
+                    matches[doc_id] = (not normalize(title).startswith(prefix), len(title), doc_id, title, poster)
+                pos += 1
+        return [(doc_id, title, poster) for _, _, doc_id, title, poster in sorted(matches.values())[:limit]]
+
+
+def build_prefix_index(items):
+    """Builds a fresh prefix index from `(doc_id, title, poster)` tuples with a single sort."""
+    index = PrefixIndex()
+    entries = []
+    for doc_id, title, poster in items:
+        index._docs[doc_id] = (title, poster)
+        entries.extend((key, doc_id) for key in index._keys_for(title))
+    entries.sort()
+    index._keys = [key for key, _ in entries]
+    index._ids = [doc_id for _, doc_id in entries]
+    return index
@@ -0,0 +1,247 @@
+"""
+Production server for MovieZone.
+
+The master process opens the listening socket and forks SERVE_WORKERS worker
+processes (default: one per CPU core). Each worker imports the app after the
+fork, so it gets its own MongoClient, and serves requests from a pool of
+SERVE_THREADS threads. Signals to the master:
+
+  SIGTERM / SIGINT  graceful shutdown: workers finish in-flight requests and exit
+  SIGHUP            rolling reload: new workers (with freshly imported code)
+                    replace the old ones one at a time
+
+Run with `python serve.py` or `python bot.py serve`.
+"""
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 5000))
+WORKERS = int(os.getenv("SERVE_WORKERS", 0)) or os.cpu_count() or 1
+THREADS = int(os.getenv("SERVE_THREADS", 8))
+GRACEFUL_TIMEOUT = float(os.getenv("SERVE_GRACEFUL_TIMEOUT", 30))
+KEEPALIVE_TIMEOUT = float(os.getenv("SERVE_KEEPALIVE_TIMEOUT", 5))
+BACKLOG = 2048
+
+
+class RequestHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Werkzeug closes every connection after one response, so this only bounds a client that
+    # connects and is slow to send its request; until then it holds one of the pool's threads.
+    timeout = KEEPALIVE_TIMEOUT
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug WSGI server that hands each connection to a pool of `threads` threads.
+    A connection is only accepted while a thread is free, so nothing queues
+    inside the worker: waiting clients stay in the kernel backlog, where
+    another worker can pick them up.
+    """
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host, port, app, threads, fd):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self.slots = threading.BoundedSemaphore(threads)
+
+    def _handle_request_noblock(self):
+        # The timeout lets serve_forever notice shutdown() while every thread is busy.
+        if not self.slots.acquire(timeout=0.5):
+            return
+        try:
+            request, client_address = self.get_request()
+        except OSError:
+            self.slots.release()
+            return
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+
+def run_worker(listener, worker_id):
+    """Body of a forked worker; returns the exit code."""
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    os.environ["SERVE_WORKER_ID"] = str(worker_id)
+    os.environ["SERVE_WORKERS"] = str(WORKERS)  # bot.py divides per-site limits by it
+    from bot import app  # imported after the fork so Mongo, TMDB sessions and threads belong to this process
+
+    server = PooledWSGIServer(HOST, PORT, app, THREADS, fd=listener.fileno())
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it cannot run on the serving thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole process group; the master decides.
+    print(f"Worker {worker_id} (pid {os.getpid()}) serving with {THREADS} threads.")
+    server.serve_forever()
+    server.pool.shutdown(wait=True)
+    print(f"Worker {worker_id} (pid {os.getpid()}) stopped.")
+    return 0
+
+
+class Master:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.children = {}  # pid -> worker id
+        self.stopping = False
+        self.reload_requested = False
+
+    def listen(self):
+        listener = socket.socket(socket.AF_INET6 if ":" in HOST else socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((HOST, PORT))
+        listener.listen(BACKLOG)
+        # Every worker polls this socket and all of them wake for a new connection; only one wins
+        # accept(). Non-blocking, the others get BlockingIOError (socketserver skips the round on
+        # OSError) instead of sleeping in accept(), where they would not notice shutdown().
+        listener.setblocking(False)
+        listener.set_inheritable(True)
+        return listener
+
+    def spawn(self, worker_id):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(self.listener, worker_id)
+            except BaseException as e:
+                print(f"Worker {worker_id} crashed: {e!r}")
+            finally:
+                sys.stdout.flush()
+                # Skip the master's cleanup; atexit hooks (e.g. buffered feedback) are run explicitly.
+                import atexit
+                atexit._run_exitfuncs()
+                os._exit(code)
+        self.children[pid] = worker_id
+        return pid
+
+    def ensure_indexes(self):
+        # Runs in a short-lived child, so the master itself never imports the app or opens a MongoClient.
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                from bot import ensure_indexes
+                ensure_indexes()
+                code = 0
+            except BaseException as e:
+                print(f"Index setup failed: {e!r}")
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        os.waitpid(pid, 0)
+
+    def run(self):
+        self.listener = self.listen()
+        # Workers write their metric totals here so /metrics on any worker reports the whole server.
+        own_metrics_dir = "METRICS_DIR" not in os.environ
+        if own_metrics_dir:
+            os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="moviezone-metrics-")
+        print(f"Master {os.getpid()} listening on {HOST}:{PORT} with {self.workers} workers x {THREADS} threads.")
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        self.ensure_indexes()
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            self.reap(respawn=True)
+            time.sleep(0.5)
+        self.shutdown()
+        if own_metrics_dir:
+            shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def reap(self, respawn):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_id = self.children.pop(pid, None)
+            if worker_id is None:
+                continue
+            if respawn and not self.stopping:
+                print(f"Worker {worker_id} (pid {pid}) exited with status {status}; restarting it.")
+                self.spawn(worker_id)
+
+    def stop_worker(self, pid):
+        """Sends SIGTERM and waits up to GRACEFUL_TIMEOUT before killing the worker."""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return
+            time.sleep(0.1)
+        print(f"Worker pid {pid} did not stop in {GRACEFUL_TIMEOUT}s; killing it.")
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    def reload(self):
+        # One worker at a time, starting its replacement first, so the socket always has readers.
+        print("Reloading workers...")
+        for pid, worker_id in list(self.children.items()):
+            self.spawn(worker_id)
+            del self.children[pid]
+            self.stop_worker(pid)
+        print("Reload finished.")
+
+    def shutdown(self):
+        print("Shutting down workers...")
+        pids = list(self.children)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.children and time.monotonic() < deadline:
+            self.reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.children):
+            print(f"Worker pid {pid} did not stop in {GRACEFUL_TIMEOUT}s; killing it.")
+            os.kill(pid, signal.SIGKILL)
+        self.listener.close()
+        print("Master stopped.")
+
+
+def main(workers=None):
+    Master(workers or WORKERS).run()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
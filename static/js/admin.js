@@ -0,0 +1,160 @@
+// Admin content and feedback tables. Pages come from the /admin/api/* JSON endpoints; the first page is embedded in the page.
+(function () {
+    const data = JSON.parse(document.getElementById('admin_data').textContent);
+    const urls = data.urls;
+    const linkTo = (template, id) => template.replace('ID', encodeURIComponent(id));
+
+    const cell = (text, className) => {
+        const td = document.createElement('td');
+        td.textContent = text == null || text === '' ? 'N/A' : text;
+        if (className) td.className = className;
+        return td;
+    };
+
+    // Appends rows a chunk per animation frame so large pages never block the UI.
+    const renderRows = (tbody, items, makeRow, emptyText, columns) => {
+        tbody.replaceChildren();
+        if (!items.length) {
+            const tr = document.createElement('tr'), td = cell(emptyText);
+            td.colSpan = columns;
+            tr.append(td);
+            tbody.append(tr);
+            return;
+        }
+        let index = 0;
+        const step = () => {
+            const fragment = document.createDocumentFragment();
+            for (const end = Math.min(index + 25, items.length); index < end; index++) fragment.append(makeRow(items[index]));
+            tbody.append(fragment);
+            if (index < items.length) requestAnimationFrame(step);
+        };
+        step();
+    };
+
+    const renderPager = (pager, page, load) => {
+        const pages = Math.max(1, Math.ceil(page.total / page.per_page));
+        const prev = document.createElement('button'), next = document.createElement('button'), label = document.createElement('span');
+        prev.textContent = 'Previous'; next.textContent = 'Next';
+        prev.disabled = page.page <= 1; next.disabled = page.page >= pages;
+        prev.onclick = () => load(page.page - 1);
+        next.onclick = () => load(page.page + 1);
+        label.textContent = `Page ${page.page} of ${pages} (${page.total} total)`;
+        pager.replaceChildren(prev, label, next);
+    };
+
+    // Selected title ids survive paging, so a bulk action can span several pages.
+    const selected = new Set();
+    const bulkBar = document.getElementById('bulk_bar');
+    const updateBulkBar = () => {
+        document.getElementById('bulk_count').textContent = selected.size + ' selected';
+        bulkBar.classList.toggle('open', selected.size > 0);
+    };
+
+    const contentRow = (movie) => {
+        const tr = document.createElement('tr');
+        const pick = document.createElement('input'), pickCell = document.createElement('td');
+        pick.type = 'checkbox'; pick.className = 'row-select'; pick.checked = selected.has(movie._id);
+        pick.onchange = () => { pick.checked ? selected.add(movie._id) : selected.delete(movie._id); updateBulkBar(); };
+        pickCell.append(pick);
+        const status = document.createElement('span');
+        status.className = 'status status-' + movie.enrichment_status;
+        status.textContent = movie.enrichment_status;
+        if (movie.enrichment_error) status.title = movie.enrichment_error;
+        const statusCell = document.createElement('td');
+        statusCell.append(status);
+        const actions = document.createElement('td');
+        actions.className = 'action-buttons';
+        const edit = document.createElement('a');
+        edit.href = linkTo(urls.edit, movie._id); edit.className = 'edit-btn'; edit.textContent = 'Edit';
+        const del = document.createElement('button');
+        del.className = 'delete-btn'; del.textContent = 'Delete';
+        del.onclick = () => { if (confirm('Delete "' + movie.title + '"?')) window.location.href = linkTo(urls.delete, movie._id); };
+        actions.append(edit, del);
+        const type = movie.type ? movie.type[0].toUpperCase() + movie.type.slice(1) : '';
+        tr.append(pickCell, cell(movie.title), cell(type), cell(movie.poster_badge), statusCell, actions);
+        return tr;
+    };
+
+    const feedbackRow = (item) => {
+        const tr = document.createElement('tr');
+        const message = cell(item.message);
+        message.style.cssText = 'white-space: pre-wrap; min-width: 300px;';
+        const date = cell(item.timestamp);
+        date.style.minWidth = '150px';
+        const actions = document.createElement('td'), del = document.createElement('a');
+        del.href = linkTo(urls.delete_feedback, item._id); del.className = 'delete-btn'; del.textContent = 'Delete';
+        del.onclick = () => confirm('Delete this feedback?');
+        actions.append(del);
+        tr.append(date, cell(item.type), cell(item.content_title), message, cell(item.email), actions);
+        return tr;
+    };
+
+    // Content table: filters, sort and page live in `state` and are sent as query parameters.
+    const contentBody = document.querySelector('#content_table tbody');
+    const contentPager = document.getElementById('content_pager');
+    const filters = document.getElementById('content_filters');
+    const state = { page: 1, sort: '' };
+    let currentPage = data.content;
+    let controller = null;
+
+    const showContent = (page) => {
+        currentPage = page;
+        document.getElementById('select_all').checked = false;
+        renderRows(contentBody, page.items, contentRow, 'No content found.', 6);
+        renderPager(contentPager, page, loadContent);
+    };
+
+    function loadContent(pageNumber) {
+        state.page = pageNumber;
+        const params = new URLSearchParams({ page: state.page });
+        if (state.sort) params.set('sort', state.sort);
+        filters.querySelectorAll('input, select').forEach(el => { if (el.value) params.set(el.name, el.value.trim()); });
+        if (controller) controller.abort();
+        controller = new AbortController();
+        fetch(urls.content + '?' + params, { signal: controller.signal })
+            .then(r => r.json()).then(showContent).catch(() => {});
+    }
+
+    let timer = null;
+    filters.addEventListener('input', () => { clearTimeout(timer); timer = setTimeout(() => loadContent(1), 250); });
+    document.querySelectorAll('#content_table th[data-sort]').forEach(th => th.addEventListener('click', () => {
+        state.sort = state.sort === 'title' ? 'title_desc' : state.sort === 'title_desc' ? '' : 'title';
+        loadContent(1);
+    }));
+
+    document.getElementById('select_all').addEventListener('change', function () {
+        currentPage.items.forEach(movie => this.checked ? selected.add(movie._id) : selected.delete(movie._id));
+        contentBody.querySelectorAll('.row-select').forEach(box => { box.checked = this.checked; });
+        updateBulkBar();
+    });
+
+    bulkBar.querySelectorAll('button[data-action]').forEach(button => button.addEventListener('click', () => {
+        const op = button.dataset.action;
+        let value = button.dataset.value;
+        if (op === 'badge') value = value === undefined ? document.getElementById('bulk_badge').value.trim() : '';
+        else if (value !== undefined) value = value === 'true';
+        if (op === 'delete' && !confirm('Delete ' + selected.size + ' titles?')) return;
+        fetch(urls.bulk, {
+            method: 'POST', headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ids: [...selected], actions: [{ op, value }] }),
+        }).then(r => r.json()).then(result => {
+            if (result.error) { alert(result.error); return; }
+            selected.clear();
+            updateBulkBar();
+            loadContent(state.page);
+        });
+    }));
+
+    const feedbackBody = document.querySelector('#feedback_table tbody');
+    const feedbackPager = document.getElementById('feedback_pager');
+    const showFeedback = (page) => {
+        renderRows(feedbackBody, page.items, feedbackRow, 'No new feedback or reports.', 6);
+        renderPager(feedbackPager, page, loadFeedback);
+    };
+    function loadFeedback(pageNumber) {
+        fetch(urls.feedback + '?page=' + pageNumber).then(r => r.json()).then(showFeedback);
+    }
+
+    showContent(data.content);
+    showFeedback(data.feedback);
+})();
@@ -0,0 +1,73 @@
+// Shared MovieZone page scripts. Every block checks for its elements, so one file serves all pages.
+const nav = document.querySelector('.main-nav');
+if (nav) {
+    window.addEventListener('scroll', () => { window.scrollY > 50 ? nav.classList.add('scrolled') : nav.classList.remove('scrolled'); });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const slides = document.querySelectorAll('.hero-slide');
+    if (slides.length > 1) {
+        let currentSlide = 0;
+        const showSlide = (index) => slides.forEach((s, i) => s.classList.toggle('active', i === index));
+        setInterval(() => { currentSlide = (currentSlide + 1) % slides.length; showSlide(currentSlide); }, 5000);
+    }
+
+    // Typeahead suggestions from /api/suggest.
+    const searchInput = document.querySelector('.search-input');
+    const suggestBox = document.querySelector('.suggest-box');
+    if (searchInput && suggestBox) {
+        let timer = null, controller = null;
+        const close = () => suggestBox.classList.remove('open');
+        searchInput.addEventListener('input', () => {
+            clearTimeout(timer);
+            const q = searchInput.value.trim();
+            if (!q) { close(); return; }
+            timer = setTimeout(() => {
+                if (controller) controller.abort();
+                controller = new AbortController();
+                fetch(searchInput.dataset.suggestUrl + "?q=" + encodeURIComponent(q), { signal: controller.signal })
+                    .then(r => r.json()).then(data => {
+                        suggestBox.replaceChildren(...data.results.map(item => {
+                            const link = document.createElement('a');
+                            link.className = 'suggest-item';
+                            link.href = item.url;
+                            const img = document.createElement('img');
+                            if (item.poster) img.src = item.poster;
+                            img.alt = '';
+                            const label = document.createElement('span');
+                            label.textContent = item.title;
+                            link.append(img, label);
+                            return link;
+                        }));
+                        suggestBox.classList.toggle('open', data.results.length > 0);
+                    }).catch(() => {});
+            }, 120);
+        });
+        searchInput.addEventListener('blur', () => setTimeout(close, 200));
+    }
+
+    // Infinite scroll: fetch the next page as a card fragment when "Load More" comes into view.
+    const loadMore = document.querySelector('.pagination .load-more');
+    const grid = document.querySelector('.full-page-grid-container .movie-grid');
+    if (loadMore && grid && 'IntersectionObserver' in window) {
+        let loading = false;
+        const observer = new IntersectionObserver((entries) => {
+            if (!entries[0].isIntersecting || loading) return;
+            loading = true;
+            const url = new URL(loadMore.href);
+            url.searchParams.set('partial', '1');
+            fetch(url).then(r => r.text()).then(html => {
+                const fragment = document.createElement('template');
+                fragment.innerHTML = html;
+                const next = fragment.content.querySelector('.load-more');
+                if (next) next.remove();
+                grid.appendChild(fragment.content);
+                if (next) { loadMore.href = next.href; loading = false; }
+                else { observer.disconnect(); loadMore.parentElement.remove(); }
+            }).catch(() => { loading = false; });
+        }, { rootMargin: '600px' });
+        observer.observe(loadMore);
+    }
+});
+
+function copyToClipboard(text) { navigator.clipboard.writeText(text).then(() => alert('Link copied!'), () => alert('Copy failed!')); }
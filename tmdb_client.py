@@ -0,0 +1,148 @@
+"""
+TMDB API client for MovieZone.
+
+All requests share one pooled `requests.Session`, and successful responses are
+kept in a small SQLite file keyed by path + params, so the same search/detail/
+videos lookup is only fetched again after its endpoint's TTL runs out. Requests that
+miss the cache can be throttled with a shared token bucket (`rate_limit`
+requests per second) so parallel imports stay inside TMDB's quota.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ratelimit import TokenBucket
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+
+# Seconds a cached response stays fresh, per endpoint kind.
+DEFAULT_TTLS = {
+    "search": 24 * 3600,
+    "details": 7 * 24 * 3600,
+    "videos": 3 * 24 * 3600,
+}
+
+
+def endpoint_of(path):
+    if path.startswith("/search/"):
+        return "search"
+    if path.endswith("/videos"):
+        return "videos"
+    return "details"
+
+
+class TMDBClient:
+    def __init__(self, api_key, cache_path="tmdb_cache.sqlite3", max_entries=50000, ttls=None,
+                 timeout=5, pool_size=10, base_url=TMDB_BASE_URL, rate_limit=None, observer=None):
+        self.api_key = api_key
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.base_url = base_url.rstrip("/")
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        # observer(endpoint, outcome, seconds) is told about every lookup: "hit", "ok" or "error".
+        self.observer = observer
+        self.counters = {"hits": 0, "misses": 0, "errors": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._db = None
+        self._writes = 0
+
+    def _connect(self):
+        # Sessions and SQLite handles must not cross a fork, so they are created per process.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            db = sqlite3.connect(self.cache_path, timeout=5, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, body TEXT, fetched_at REAL, accessed_at REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._session, self._db, self._pid = session, db, os.getpid()
+
+    def get(self, path, **params):
+        """GETs `path` (e.g. "/search/movie") with `params`; raises requests.RequestException on failure."""
+        self._connect()
+        endpoint = endpoint_of(path)
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        cached = self._cache_get(key, self.ttls[endpoint])
+        if cached is not None:
+            self.counters["hits"] += 1
+            if self.observer:
+                self.observer(endpoint, "hit", 0.0)
+            return cached
+        self.counters["misses"] += 1
+        if self.limiter:
+            self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            res = self._session.get(self.base_url + path, params=dict(params, api_key=self.api_key), timeout=self.timeout)
+            res.raise_for_status()
+            data = res.json()
+        except requests.RequestException:
+            self.counters["errors"] += 1
+            if self.observer:
+                self.observer(endpoint, "error", time.perf_counter() - started)
+            raise
+        if self.observer:
+            self.observer(endpoint, "ok", time.perf_counter() - started)
+        self._cache_put(key, endpoint, data)
+        return data
+
+    def _cache_get(self, key, ttl):
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT body, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if not row or now - row[1] > ttl:
+                    return None
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"TMDB cache read failed: {e}")
+            return None
+
+    def _cache_put(self, key, endpoint, data):
+        now = time.time()
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, endpoint, body, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, endpoint, json.dumps(data), now, now),
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._evict()
+        except sqlite3.Error as e:
+            print(f"TMDB cache write failed: {e}")
+
+    def _evict(self):
+        # Drops the least recently used responses once the cache grows past max_entries.
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            self.counters["evictions"] += excess
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return dict(self.counters, hit_rate=round(self.counters["hits"] / lookups, 3) if lookups else None)
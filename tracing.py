@@ -0,0 +1,171 @@
+"""
+Per-request tracing for MovieZone.
+
+While a request is handled, its thread holds a Trace. The Trace counts every
+Mongo command, which it gets from a pymongo CommandListener. It also counts
+every outbound HTTP call, which the TMDB client and the poster cache report.
+Commands run by background threads are not counted, because those threads
+have no trace. headers() turns the totals into X-DB-Queries and Server-Timing
+response headers; they reveal backend timings, so the app only sends them to
+admins. Requests over the query or latency budget are logged with a
+breakdown by collection and command.
+
+A sampled share of requests can also run under cProfile. Their stats are
+dumped to <profile_dir>/<route>/, where `python -m pstats` or snakeviz can
+open them. Only one request per process is profiled at a time.
+"""
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from pymongo import monitoring
+
+
+class Trace:
+    def __init__(self, route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.db_errors = 0
+        self.commands = Counter()  # "collection.command" -> count
+        self.http_count = 0
+        self.http_seconds = 0.0
+        self.http = Counter()  # target -> count
+        self.profiler = None
+        self._collections = {}  # Mongo request_id -> collection, for commands still running
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        commands = ", ".join(f"{name} x{count}" for name, count in self.commands.most_common())
+        http = ", ".join(f"{name} x{count}" for name, count in self.http.most_common())
+        return (f"{self.db_count} queries in {self.db_seconds * 1000:.1f} ms ({commands or 'none'}); "
+                f"{self.http_count} HTTP calls in {self.http_seconds * 1000:.1f} ms ({http or 'none'})")
+
+
+class RequestTracer:
+    """
+    `max_queries` and `slow_ms` are the logging budget (0 turns a check off).
+    `profile_rate` is the share of requests to profile, optionally only for
+    the route rules in `profile_routes`. At most `profile_keep` dumps are
+    kept per route.
+    """
+    def __init__(self, max_queries=0, slow_ms=0, profile_rate=0.0, profile_dir="profiles",
+                 profile_routes=None, profile_keep=50):
+        self.max_queries = max_queries
+        self.slow_ms = slow_ms
+        self.profile_rate = profile_rate
+        self.profile_dir = profile_dir
+        self.profile_routes = set(profile_routes or ())
+        self.profile_keep = profile_keep
+        self.counters = {"traced": 0, "over_budget": 0, "profiled": 0}
+        self.listener = MongoCommandTracer(self)
+        self._local = threading.local()
+        # cProfile can only have one active profiler per process.
+        self._profile_lock = threading.Lock()
+
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def start(self, route):
+        trace = self._local.trace = Trace(route)
+        self.counters["traced"] += 1
+        if self._should_profile(route) and self._profile_lock.acquire(blocking=False):
+            trace.profiler = cProfile.Profile()
+            try:
+                trace.profiler.enable()
+            except ValueError:  # another profiler, e.g. a debugger, is already active
+                trace.profiler = None
+                self._profile_lock.release()
+        return trace
+
+    def _should_profile(self, route):
+        if self.profile_rate <= 0 or (self.profile_routes and route not in self.profile_routes):
+            return False
+        return random.random() < self.profile_rate
+
+    def finish(self):
+        """Ends the current thread's trace and returns it, or None if there is none."""
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return None
+        self._local.trace = None
+        if trace.profiler is not None:
+            trace.profiler.disable()
+            self._profile_lock.release()
+            try:
+                self._dump(trace)
+            except OSError as e:
+                print(f"Profile dump failed: {e}")
+        return trace
+
+    def record_http(self, target, seconds):
+        trace = self.current()
+        if trace is not None:
+            trace.http_count += 1
+            trace.http_seconds += seconds
+            trace.http[target] += 1
+
+    def headers(self, trace):
+        timings = [f'db;desc="{trace.db_count} queries";dur={trace.db_seconds * 1000:.1f}']
+        if trace.http_count:
+            timings.append(f'http;desc="{trace.http_count} calls";dur={trace.http_seconds * 1000:.1f}')
+        timings.append(f"total;dur={trace.elapsed() * 1000:.1f}")
+        return {"X-DB-Queries": str(trace.db_count), "Server-Timing": ", ".join(timings)}
+
+    def over_budget(self, trace):
+        return ((self.max_queries and trace.db_count > self.max_queries)
+                or (self.slow_ms and trace.elapsed() * 1000 > self.slow_ms))
+
+    def check_budget(self, trace, description):
+        if self.over_budget(trace):
+            self.counters["over_budget"] += 1
+            print(f"Over budget: {description} took {trace.elapsed() * 1000:.0f} ms; {trace.summary()}")
+
+    def _dump(self, trace):
+        route_dir = os.path.join(self.profile_dir, re.sub(r"[^A-Za-z0-9]+", "_", trace.route).strip("_") or "root")
+        os.makedirs(route_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{trace.elapsed() * 1000:.0f}ms.prof"
+        trace.profiler.dump_stats(os.path.join(route_dir, name))
+        self.counters["profiled"] += 1
+        dumps = sorted((entry for entry in os.scandir(route_dir) if entry.name.endswith(".prof")),
+                       key=lambda entry: entry.stat().st_mtime)
+        for entry in dumps[:-self.profile_keep]:
+            os.remove(entry.path)
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Adds Mongo commands to the trace of the thread that runs them; pymongo publishes events on that thread."""
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def started(self, event):
+        trace = self.tracer.current()
+        if trace is not None:
+            target = event.command.get(event.command_name)
+            if not isinstance(target, str):
+                target = event.command.get("collection", "-")
+            trace._collections[event.request_id] = target
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        trace = self._record(event)
+        if trace is not None:
+            trace.db_errors += 1
+
+    def _record(self, event):
+        trace = self.tracer.current()
+        if trace is not None:
+            collection = trace._collections.pop(event.request_id, "-")
+            trace.db_count += 1
+            trace.db_seconds += event.duration_micros / 1e6
+            trace.commands[f"{collection}.{event.command_name}"] += 1
+        return trace